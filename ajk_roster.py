@@ -0,0 +1,41 @@
+import os
+import streamlit as st
+from mom_io import atomic_write_bytes
+
+AJK_PATH = "ajk.csv"
+AJK_COLUMNS = ["Siri", "Nama", "Jawatan", "Kategori", "Singkatan", "Portfolio", "Hadir"]
+
+
+def roster_signature(path=AJK_PATH):
+    """
+    Returns (mtime_ns, size) of the roster file, or None if it does not exist.
+    Used both as the cache key and to detect saves from other sessions.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _read_roster(path, signature):
+    # signature is part of the cache key only; a new save yields a new entry
+    import pandas as pd
+    if signature is None:
+        return pd.DataFrame(columns=AJK_COLUMNS)
+    return pd.read_csv(path)
+
+
+def load_ajk_roster(path=AJK_PATH):
+    """
+    Returns (DataFrame, signature). The CSV is parsed once per file version and
+    shared by all sessions in the process.
+    """
+    signature = roster_signature(path)
+    return _read_roster(path, signature), signature
+
+
+def save_ajk_roster(df, path=AJK_PATH):
+    atomic_write_bytes(path, df.to_csv(index=False).encode("utf-8"))
+    return roster_signature(path)
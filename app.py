@@ -1,10 +1,16 @@
+import copy
 import streamlit as st
-import os
-import json
-import base64
-import pandas as pd
-from mom_logic import initialize_mom_state, ingest_previous_mom
-from generate_mom_reportlab import MOMReportLab
+from functools import partial
+# pandas, ReportLab, groq and pypdf are imported inside the stages that use them,
+# so a cold start only pays for what the first stage needs
+from mom_logic import (initialize_mom_state, ingest_previous_mom, split_attendance, apply_editor_changes,
+                       apply_roster_changes)
+from attendance import has_quorum, quorum_size
+from mom_io import dumps_mom, loads_mom
+from ajk_roster import roster_signature, load_ajk_roster, save_ajk_roster
+from pdf_jobs import RenderQueue, mom_hash, render_docx
+from pdf_preview import thumbnails_available, render_thumbnails, publish_static_pdf
+import instrumentation
 from llm_helper import generate_chairman_note, generate_closing_remark, generate_new_matter, summarize_financial_report
 
 st.set_page_config(page_title="MOM Crafter", layout="wide")
@@ -46,6 +52,87 @@ if 'mom_data' not in st.session_state:
     st.session_state.mom_data = initialize_mom_state()
 if 'current_stage' not in st.session_state:
     st.session_state.current_stage = 0
+if 'mom_export_cache' not in st.session_state:
+    st.session_state.mom_export_cache = {}
+
+def touch_mom():
+    """
+    Drops cached exports after any change to mom_data. The cache is cleared in place
+    because the sidebar download callable holds a reference to it and is not
+    re-rendered by fragment reruns.
+    """
+    st.session_state.mom_export_cache.clear()
+
+def cached_mom_export(cache, mom_data, compact=False):
+    """
+    Returns the serialized MOM, reusing the cached bytes until the next touch_mom().
+    Takes plain arguments (no st.session_state) so it can run from the download thread.
+    """
+    if compact not in cache:
+        cache[compact] = dumps_mom(mom_data, compact=compact)
+    return cache[compact]
+
+def mom_export_args():
+    return (st.session_state.mom_export_cache, st.session_state.mom_data)
+
+WIDGET_PREFIX = "mom__"
+
+def reset_stage_widgets():
+    """
+    Drops bound widget and editor state so stages are rebuilt from mom_data
+    after it was changed outside a widget (ingest, reset, LLM output).
+    """
+    for k in list(st.session_state.keys()):
+        if k.startswith(WIDGET_PREFIX):
+            del st.session_state[k]
+
+def sync_field(path, key):
+    """
+    on_change callback: writes one widget value into mom_data at the given key path.
+    """
+    target = st.session_state.mom_data
+    for part in path[:-1]:
+        target = target.setdefault(part, {})
+    target[path[-1]] = st.session_state[key]
+    touch_mom()
+
+def bound_widget(widget_fn, label, path, default="", **kwargs):
+    """
+    Renders a text widget whose edits are written straight into mom_data[path...].
+    """
+    key = WIDGET_PREFIX + "/".join(path)
+    target = st.session_state.mom_data
+    for part in path[:-1]:
+        target = target.setdefault(part, {})
+    return widget_fn(label, target.get(path[-1], default), key=key,
+                     on_change=sync_field, args=(path, key), **kwargs)
+
+def sync_table(section, key, columns):
+    """
+    on_change callback for a data editor bound to a list section of mom_data.
+    """
+    rows = st.session_state.mom_data.setdefault(section, [])
+    base_rows, _ = st.session_state[key + "_base"]
+    apply_editor_changes(rows, base_rows, st.session_state[key], columns)
+    touch_mom()
+
+def bound_table(section, default_row, **kwargs):
+    """
+    Renders a data editor over mom_data[section]. The base DataFrame is built once per
+    mount and kept stable, so the editor keeps its edits and reruns skip the rebuild.
+    """
+    key = WIDGET_PREFIX + section
+    columns = list(default_row)
+    if key not in st.session_state or key + "_base" not in st.session_state:
+        import pandas as pd
+        base_rows = [dict(r) for r in st.session_state.mom_data.get(section, [])] or [dict(default_row)]
+        base_df = pd.DataFrame(base_rows)
+        for col in columns:
+            if col not in base_df.columns:
+                base_df[col] = ""
+        st.session_state[key + "_base"] = (base_rows, base_df)
+    _, base_df = st.session_state[key + "_base"]
+    return st.data_editor(base_df, key=key, on_change=sync_table, args=(section, key, columns), **kwargs)
 
 def next_stage():
     st.session_state.current_stage += 1
@@ -75,73 +162,98 @@ with st.sidebar:
     if st.button("Reset Session"):
         st.session_state.mom_data = initialize_mom_state()
         st.session_state.current_stage = 0
+        touch_mom()
+        reset_stage_widgets()
         st.rerun()
 
-    exported_json = json.dumps(st.session_state.mom_data, indent=4)
+    # Serialized only when the download is actually requested
     st.download_button(
         label="Download Current JSON",
-        data=exported_json,
+        data=partial(cached_mom_export, *mom_export_args()),
         file_name="mom_draft.json",
         mime="application/json"
     )
 
+    # Opt-in (MOM_PROFILE=1): per-phase export timings recorded by instrumentation
+    if instrumentation.is_enabled():
+        with st.expander("⏱ Render Timings"):
+            timings = instrumentation.summarize()
+            if timings:
+                st.dataframe(timings, hide_index=True)
+            else:
+                st.caption("No timings recorded yet.")
+
 # Workflow Stages
+# Each stage is a fragment: interacting with its widgets reruns only that stage,
+# not the CSS, sidebar and other stages. Full reruns happen on navigation/ingest/reset.
 current_stage = st.session_state.current_stage
 
-if current_stage == 0: # Initialization
+@st.fragment
+def render_initialization():
     st.header("Stage 1: Initialization")
     st.info("Start a new meeting or load items from a previous minutes to update 'Matters Arising'.")
     
     uploaded_prev = st.file_uploader("Upload Previous MOM JSON (optional)", type=["json"])
     if uploaded_prev:
         try:
-            prev_data = json.load(uploaded_prev)
+            prev_data = loads_mom(uploaded_prev.getvalue())
             if st.button("Ingest Previous Minutes"):
                 st.session_state.mom_data = ingest_previous_mom(prev_data)
+                touch_mom()
                 # Clear editor states to force refresh from new data
-                for k in ["hadir_editor", "tidak_editor", "ma_editor", "nm_editor"]:
-                    if k in st.session_state:
-                         del st.session_state[k]
+                reset_stage_widgets()
                 st.success("Previous items ingested into 'Matters Arising'!")
                 st.rerun()
         except Exception as e:
             st.error(f"Error loading JSON: {e}")
 
-elif current_stage == 1: # Header Info
+@st.fragment
+def render_header():
     st.header("Stage 2: Header Information")
     col1, col2 = st.columns(2)
     with col1:
-        title = st.text_input("Meeting Title", st.session_state.mom_data["Header"]["Title"])
-        siri = st.text_input("Serial (Siri)", st.session_state.mom_data["Header"]["Siri"])
-        jenis_map = {"agm": 0, "exco": 1}
-        jenis_idx = jenis_map.get(st.session_state.mom_data["Header"]["Jenis"], 0)
-        jenis = st.selectbox("Meeting Type", ["agm", "exco"], index=jenis_idx)
+        bound_widget(st.text_input, "Meeting Title", ["Header", "Title"])
+        bound_widget(st.text_input, "Serial (Siri)", ["Header", "Siri"])
+        jenis_options = ["agm", "exco"]
+        jenis = st.session_state.mom_data["Header"]["Jenis"]
+        st.selectbox("Meeting Type", jenis_options,
+                     index=jenis_options.index(jenis) if jenis in jenis_options else 0,
+                     key=WIDGET_PREFIX + "Header/Jenis",
+                     on_change=sync_field, args=(["Header", "Jenis"], WIDGET_PREFIX + "Header/Jenis"))
     with col2:
-        tarikh = st.text_input("Date (DD/MM/YYYY)", st.session_state.mom_data["Header"]["Tarikh"])
-        masa = st.text_input("Time", st.session_state.mom_data["Header"]["Masa"])
-        tempat = st.text_input("Venue", st.session_state.mom_data["Header"]["Tempat"])
-    
-    if st.button("🔄 Sync Header Info"):
-        st.session_state.mom_data["Header"].update({
-            "Title": title,
-            "Siri": siri,
-            "Jenis": jenis,
-            "Tarikh": tarikh,
-            "Masa": masa,
-            "Tempat": tempat
-        })
-        st.success("Header info updated!")
-
-elif current_stage == 2: # Attendance
+        bound_widget(st.text_input, "Date (DD/MM/YYYY)", ["Header", "Tarikh"])
+        bound_widget(st.text_input, "Time", ["Header", "Masa"])
+        bound_widget(st.text_input, "Venue", ["Header", "Tempat"])
+
+def sync_roster_rows():
+    """
+    on_change callback for the roster editor: only the members whose rows were edited,
+    added or deleted since the last sync are moved or updated in the attendance lists.
+    """
+    changes = st.session_state.ajk_editor
+    attendance = st.session_state.mom_data["Attendance"]
+    apply_roster_changes(attendance["Hadir"], attendance["Tidak Hadir"], st.session_state.ajk_rows,
+                         changes, st.session_state.get("ajk_applied"))
+    st.session_state.ajk_applied = copy.deepcopy(changes)
+    touch_mom()
+
+@st.fragment
+def render_attendance():
     st.header("Stage 3: Attendance Management")
+    import pandas as pd
     
-    # Load AJK CSV
-    ajk_path = "ajk.csv"
-    if 'ajk_df' not in st.session_state:
-        if os.path.exists(ajk_path):
-            st.session_state.ajk_df = pd.read_csv(ajk_path)
-        else:
-            st.session_state.ajk_df = pd.DataFrame(columns=["Siri", "Nama", "Jawatan", "Kategori", "Singkatan", "Portfolio", "Hadir"])
+    # Load AJK CSV (process-wide cache, re-read only when the file changes)
+    ajk_sig = roster_signature()
+    if st.session_state.get('ajk_sig') != ajk_sig:
+        if 'ajk_sig' in st.session_state:
+            # Saved from another session: drop local editor state so the new roster shows
+            if "ajk_editor" in st.session_state:
+                del st.session_state["ajk_editor"]
+            st.info("ajk.csv was updated in another session. The list has been reloaded.")
+        st.session_state.ajk_df, st.session_state.ajk_sig = load_ajk_roster()
+        # Row dicts of the editor's base roster, for the per-row sync below
+        st.session_state.ajk_rows = st.session_state.ajk_df.to_dict("records")
+        st.session_state.ajk_applied = {}
 
     st.subheader("Manage AJK List (ajk.csv)")
     edited_ajk = st.data_editor(
@@ -155,41 +267,45 @@ elif current_stage == 2: # Attendance
                 help="Attendance Status"
             )
         },
-        key="ajk_editor"
+        key="ajk_editor",
+        on_change=sync_roster_rows
     )
 
+    def sync_attendance():
+        # Full rebuild from the roster, keeping recorded reasons for absence
+        hadir_list, tidak_hadir_list = split_attendance(
+            edited_ajk, st.session_state.mom_data["Attendance"]["Tidak Hadir"]
+        )
+        st.session_state.mom_data["Attendance"]["Hadir"] = hadir_list
+        st.session_state.mom_data["Attendance"]["Tidak Hadir"] = tidak_hadir_list
+        st.session_state.ajk_applied = copy.deepcopy(st.session_state.get("ajk_editor", {}))
+        touch_mom()
+
     col_btn1, col_btn2 = st.columns(2)
     with col_btn1:
         if st.button("💾 Save Changes to ajk.csv"):
-            edited_ajk.to_csv(ajk_path, index=False)
+            st.session_state.ajk_sig = save_ajk_roster(edited_ajk)
             st.session_state.ajk_df = edited_ajk
-            st.success("Successfully saved to ajk.csv!")
+            # The saved roster is the editor's new base, without pending edits
+            st.session_state.ajk_rows = edited_ajk.to_dict("records")
+            st.session_state.ajk_applied = {}
+            del st.session_state["ajk_editor"]
+            st.toast("Successfully saved to ajk.csv!")
+            st.rerun(scope="fragment")
     
     with col_btn2:
-        if st.button("🔄 Sync with Session Attendance"):
-            # Update session state mom_data based on edited_ajk
-            hadir_list = []
-            tidak_hadir_list = []
-            
-            for _, row in edited_ajk.iterrows():
-                record = {
-                    "siri": str(row.get('Siri', '')),
-                    "nama": str(row.get('Nama', '')),
-                    "jawatan": str(row.get('Jawatan', '')),
-                    "singkatan": str(row.get('Singkatan', ''))
-                }
-                if str(row.get('Hadir', '')).strip() == "Ya":
-                    hadir_list.append(record)
-                else:
-                    record["sebab"] = "" # Default empty reason
-                    tidak_hadir_list.append(record)
-            
-            st.session_state.mom_data["Attendance"]["Hadir"] = hadir_list
-            st.session_state.mom_data["Attendance"]["Tidak Hadir"] = tidak_hadir_list
+        if st.button("🔄 Load Attendance from Roster"):
+            sync_attendance()
             st.success("Session attendance updated!")
 
     st.divider()
     st.subheader("Verification: Attendance Lists")
+    hadir = st.session_state.mom_data["Attendance"]["Hadir"]
+    tidak_hadir = st.session_state.mom_data["Attendance"]["Tidak Hadir"]
+    if hadir or tidak_hadir:
+        members = len(hadir) + len(tidak_hadir)
+        status = "✅ quorum reached" if has_quorum(hadir, tidak_hadir) else "⚠️ no quorum"
+        st.caption(f"{len(hadir)} of {members} present (quorum {quorum_size(members)}): {status}")
     
     tab_hadir, tab_tidak = st.tabs(["✅ Hadir (Present)", "❌ Tidak Hadir (Absent)"])
     
@@ -205,33 +321,24 @@ elif current_stage == 2: # Attendance
         else:
             st.info("No absentees recorded.")
 
-elif current_stage == 3: # Matters Arising
+@st.fragment
+def render_matters_arising():
     st.header("Stage 4: Matters Arising")
     st.write("Status updates on items from the previous meeting.")
     
-    ma_df = pd.DataFrame(st.session_state.mom_data["MattersArising"])
-    if ma_df.empty:
-        ma_df = pd.DataFrame([{"Perkara": "", "Keputusan": "Pelaksanaan", "Keterangan": ""}])
-    
-    # Ensure columns exist
-    for col in ["Perkara", "Keputusan", "Keterangan"]:
-        if col not in ma_df.columns:
-            ma_df[col] = ""
-
-    st.info("Tip: Edit the table below and click 'Sync Matters Arising' to save changes to the session.")
-    edited_ma = st.data_editor(ma_df, num_rows="dynamic", use_container_width=True, 
-                               column_config={
-                                   "Keputusan": st.column_config.SelectboxColumn(
-                                       "Keputusan",
-                                       options=["Selesai", "Dilanjutkan", "Tangguh", "Batal", "Pelaksanaan", "Makluman"]
-                                   )
-                               }, key="ma_editor_stable")
-    
-    if st.button("🔄 Sync Matters Arising"):
-        st.session_state.mom_data["MattersArising"] = edited_ma.to_dict('records')
-        st.success("Matters Arising updated in session!")
+    st.info("Tip: Changes to the table below are saved to the session as you edit.")
+    bound_table("MattersArising", {"Perkara": "", "Keputusan": "Pelaksanaan", "Keterangan": ""},
+                num_rows="dynamic", use_container_width=True,
+                column_config={
+                    "Keputusan": st.column_config.SelectboxColumn(
+                        "Keputusan",
+                        options=["Selesai", "Dilanjutkan", "Tangguh", "Batal", "Pelaksanaan", "Makluman"]
+                    )
+                })
+    render_section_preview("MattersArising")
 
-elif current_stage == 4: # Main Agenda
+@st.fragment
+def render_main_agenda():
     st.header("Stage 5: Main Agenda Items")
     
     st.subheader("Chairman's Welcome Note")
@@ -261,18 +368,17 @@ elif current_stage == 4: # Main Agenda
                         st.error("The LLM returned empty content. Please try again with more detailed points.")
                     else:
                         st.session_state.mom_data["ChairmanAddress"]["Keterangan"] = generated_text
-                        st.rerun()
-
-    c_perkara = st.text_input("Title (Agenda 1)", st.session_state.mom_data["ChairmanAddress"].get("Perkara", "UCAPAN PEMBUKAAN OLEH PRESIDEN"))
-    c_keterangan = st.text_area("Content (Agenda 1)", st.session_state.mom_data["ChairmanAddress"].get("Keterangan", ""), height=200)
+                        touch_mom()
+                        reset_stage_widgets()
+                        st.rerun(scope="fragment")
 
-    # Show success message if content was just generated (heuristic: matches generated text?)
-    # Or just let the user see the content.
+    bound_widget(st.text_input, "Title (Agenda 1)", ["ChairmanAddress", "Perkara"], "UCAPAN PEMBUKAAN OLEH PRESIDEN")
+    bound_widget(st.text_area, "Content (Agenda 1)", ["ChairmanAddress", "Keterangan"], height=200)
     
     st.divider()
     st.subheader("Confirmation of Previous Minutes")
-    a_perkara = st.text_input("Title (Agenda 2)", st.session_state.mom_data["ApprovalOfPrevMinutes"].get("Perkara", "MENGESAHKAN MINIT MESYUARAT JAWATANKUASA SIRI ..."))
-    a_keterangan = st.text_area("Content (Agenda 2)", st.session_state.mom_data["ApprovalOfPrevMinutes"].get("Keterangan", ""), height=100)
+    bound_widget(st.text_input, "Title (Agenda 2)", ["ApprovalOfPrevMinutes", "Perkara"], "MENGESAHKAN MINIT MESYUARAT JAWATANKUASA SIRI ...")
+    bound_widget(st.text_area, "Content (Agenda 2)", ["ApprovalOfPrevMinutes", "Keterangan"], height=100)
     
     st.divider()
     st.subheader("Financial & Membership Reports")
@@ -292,28 +398,23 @@ elif current_stage == 4: # Main Agenda
                             st.error(summary)
                         else:
                             st.session_state.mom_data["Reports"]["Financial"]["Keterangan"] = summary
-                            st.rerun()
+                            touch_mom()
+                            reset_stage_widgets()
+                            st.rerun(scope="fragment")
 
-        f_perkara = st.text_input("Title (Agenda 4)", st.session_state.mom_data["Reports"]["Financial"].get("Perkara", "LAPORAN KEWANGAN BERAKHIR"))
-        f_keterangan = st.text_area("Content (Agenda 4)", st.session_state.mom_data["Reports"]["Financial"].get("Keterangan", ""), height=150)
+        bound_widget(st.text_input, "Title (Agenda 4)", ["Reports", "Financial", "Perkara"], "LAPORAN KEWANGAN BERAKHIR")
+        bound_widget(st.text_area, "Content (Agenda 4)", ["Reports", "Financial", "Keterangan"], height=150)
         
     with col_rep2:
         st.write("**Membership Report**")
-        m_perkara = st.text_input("Title (Agenda 5)", st.session_state.mom_data["Reports"]["Membership"].get("Perkara", "LAPORAN KEAHLIAN BERAKHIR"))
-        m_keterangan = st.text_area("Content (Agenda 5)", st.session_state.mom_data["Reports"]["Membership"].get("Keterangan", ""), height=150)
-
-    if st.button("🔄 Sync Main Agenda Items"):
-        st.session_state.mom_data["ChairmanAddress"]["Perkara"] = c_perkara
-        st.session_state.mom_data["ChairmanAddress"]["Keterangan"] = c_keterangan
-        st.session_state.mom_data["ApprovalOfPrevMinutes"]["Perkara"] = a_perkara
-        st.session_state.mom_data["ApprovalOfPrevMinutes"]["Keterangan"] = a_keterangan
-        st.session_state.mom_data["Reports"]["Financial"]["Perkara"] = f_perkara
-        st.session_state.mom_data["Reports"]["Financial"]["Keterangan"] = f_keterangan
-        st.session_state.mom_data["Reports"]["Membership"]["Perkara"] = m_perkara
-        st.session_state.mom_data["Reports"]["Membership"]["Keterangan"] = m_keterangan
-        st.success("Main Agenda items updated!")
-
-elif current_stage == 5: # New Matters
+        bound_widget(st.text_input, "Title (Agenda 5)", ["Reports", "Membership", "Perkara"], "LAPORAN KEAHLIAN BERAKHIR")
+        bound_widget(st.text_area, "Content (Agenda 5)", ["Reports", "Membership", "Keterangan"], height=150)
+
+    st.divider()
+    render_section_preview("ChairmanAddress", "ApprovalOfPrevMinutes", "Financial", "Membership")
+
+@st.fragment
+def render_new_matters():
     st.header("Stage 6: New Matters & Decisions")
     
     # 1. Normalize data structure if it has old keys (one-time migration)
@@ -327,17 +428,9 @@ elif current_stage == 5: # New Matters
                 "Keputusan": entry.get("Keputusan", entry.get("keputusan", ""))
             })
         st.session_state.mom_data["NewMatters"] = normalized
+        touch_mom()
+        reset_stage_widgets()
 
-    # 2. Build DataFrame from stable session state
-    nm_df = pd.DataFrame(st.session_state.mom_data.get("NewMatters", []))
-    if nm_df.empty:
-        nm_df = pd.DataFrame([{"Perkara": "", "Keterangan": "", "Keputusan": ""}])
-    
-    # Ensure all columns exist
-    for col in ["Perkara", "Keterangan", "Keputusan"]:
-        if col not in nm_df.columns:
-            nm_df[col] = ""
-    
     st.write("Tip: To delete a row, select it using the checkbox on the left and press 'Delete' on your keyboard.")
     
     # LLM Point-based Input for New Matters
@@ -369,25 +462,22 @@ elif current_stage == 5: # New Matters
                         # Append to session state
                         new_item = {"Perkara": nm_title, "Keterangan": generated_nm, "Keputusan": ""}
                         st.session_state.mom_data["NewMatters"].append(new_item)
+                        touch_mom()
                         
                         # Clear editor state to force refresh
-                        if "nm_editor_stable" in st.session_state:
-                            del st.session_state["nm_editor_stable"]
+                        reset_stage_widgets()
                         
                         st.success(f"Added '{nm_title}' to New Matters!")
-                        st.rerun()
-
-    edited_nm = st.data_editor(nm_df, num_rows="dynamic", use_container_width=True, 
-                               column_config={
-                                   "Perkara": st.column_config.TextColumn("Perkara", width="medium"),
-                                   "Keterangan": st.column_config.TextColumn("Keterangan", width="large"),
-                                   "Keputusan": st.column_config.TextColumn("Keputusan", width="medium")
-                               }, key="nm_editor_stable") 
-    
-    # 3. Save back to session state via Sync button
-    if st.button("🔄 Sync New Matters"):
-        st.session_state.mom_data["NewMatters"] = edited_nm.to_dict('records')
-        st.success("New Matters updated in session!")
+                        st.rerun(scope="fragment")
+
+    # 2. Edits are written back to session state as they happen
+    bound_table("NewMatters", {"Perkara": "", "Keterangan": "", "Keputusan": ""},
+                num_rows="dynamic", use_container_width=True,
+                column_config={
+                    "Perkara": st.column_config.TextColumn("Perkara", width="medium"),
+                    "Keterangan": st.column_config.TextColumn("Keterangan", width="large"),
+                    "Keputusan": st.column_config.TextColumn("Keputusan", width="medium")
+                })
     
     st.subheader("Final Remarks")
     
@@ -415,76 +505,157 @@ elif current_stage == 5: # New Matters
                         st.error("The LLM returned empty content. Please try again.")
                     else:
                         st.session_state.mom_data["Closing"] = generated_closing
-                        st.rerun()
+                        touch_mom()
+                        reset_stage_widgets()
+                        st.rerun(scope="fragment")
 
-    st.session_state.mom_data["Closing"] = st.text_area("Closing Remarks", st.session_state.mom_data.get("Closing", ""))
-    st.session_state.mom_data["Annex"] = st.text_area("Annex (Kembaran) - Paste Markdown Tables", 
-                                                    st.session_state.mom_data.get("Annex", ""),
-                                                    height=200,
-                                                    help="Paste markdown tables that should appear as annexes.")
+    bound_widget(st.text_area, "Closing Remarks", ["Closing"])
+    bound_widget(st.text_area, "Annex (Kembaran) - Paste Markdown Tables", ["Annex"],
+                 height=200,
+                 help="Paste markdown tables that should appear as annexes.")
+    render_section_preview("NewMatters", "Closing", "Annex")
 
-elif current_stage == 6: # Export
+@st.fragment
+def render_export():
     st.header("Stage 7: Finalize & Generate PDF")
     
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Raw Data Preview")
-        st.json(st.session_state.mom_data)
+        # Pre-serialized string is passed through by st.json without re-encoding
+        st.json(cached_mom_export(*mom_export_args(), compact=True).decode("utf-8"))
     
     with col2:
         st.subheader("Generate Output")
         
-        # We need a formal save for the PDF generator
-        import tempfile
-        import os
-        
+        # Renders run on the shared background queue; results are keyed by the draft's hash,
+        # so an unchanged draft (from any session) is shown without rendering again
+        render_queue = get_render_queue()
+        mom_bytes = cached_mom_export(*mom_export_args(), compact=True)
         if st.button("Generate Formal PDF"):
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".json", mode='w') as f:
-                json.dump(st.session_state.mom_data, f)
-                tmp_json_path = f.name
-            
-            output_pdf = tempfile.mktemp(suffix=".pdf")
-            try:
-                mom = MOMReportLab(tmp_json_path, output_pdf)
-                mom.create_pdf()
-                
-                if os.path.exists(output_pdf):
-                    with open(output_pdf, "rb") as f:
-                        pdf_bytes = f.read()
-                    
-                    st.success("PDF Generated Successfully!")
-                    
-                    # Preview PDF
-                    base64_pdf = base64.b64encode(pdf_bytes).decode('utf-8')
-                    pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="600" type="application/pdf"></iframe>'
-                    st.markdown(pdf_display, unsafe_allow_html=True)
-                    
-                    st.download_button(
-                        label="Download PDF",
-                        data=pdf_bytes,
-                        file_name=f"MOM_{st.session_state.mom_data['Header']['Siri'].replace('/', '_')}.pdf",
-                        mime="application/pdf"
-                    )
-            except Exception as e:
-                st.error(f"PDF Generation failed: {e}")
-            finally:
-                if 'tmp_json_path' in locals() and os.path.exists(tmp_json_path):
-                    os.remove(tmp_json_path)
+            render_queue.submit(mom_bytes)
+        job = render_queue.get(mom_hash(mom_bytes))
+        if job is not None:
+            # Poll as a self-refreshing fragment only while the render is in flight
+            polling = job.pending
+            st.fragment(render_pdf_status, run_every=0.5 if polling else None)(job, polling)
+
+        # Word export renders in-process in a fraction of a second, so it is only built
+        # when the download is requested
+        st.download_button(
+            label="Download Word (DOCX)",
+            data=partial(docx_export, mom_bytes),
+            file_name=f"MOM_{st.session_state.mom_data['Header']['Siri'].replace('/', '_')}.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        )
+        
+        # Printable HTML from the same renderer as the formatted preview below
+        st.download_button(
+            label="Download Printable HTML",
+            data=partial(html_preview, mom_bytes, standalone=True),
+            file_name=f"MOM_{st.session_state.mom_data['Header']['Siri'].replace('/', '_')}.html",
+            mime="text/html"
+        )
         
         st.divider()
         st.subheader("Serial Continuity")
         if st.button("Prepare JSON for NEXT Meeting"):
             # Map current session to next session state
             next_session_data = ingest_previous_mom(st.session_state.mom_data)
-            next_json = json.dumps(next_session_data, indent=4)
             st.download_button(
                 label="Download NEXT Meeting JSON",
-                data=next_json,
+                data=dumps_mom(next_session_data),
                 file_name="next_meeting_init.json",
                 mime="application/json"
             )
             st.info("This JSON contains your current 'New Matters' as 'Matters Arising' for the next session.")
 
+    # The formatted minutes as HTML, re-rendered in milliseconds on each edit;
+    # the PDF is only built for the final export above
+    if st.toggle("📄 Formatted preview", value=True, key="export_html_preview"):
+        st.html(html_preview(mom_bytes))
+
+def docx_export(mom_bytes):
+    return render_docx(loads_mom(mom_bytes))
+
+@st.cache_resource
+def get_render_queue():
+    return RenderQueue()
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def pdf_thumbnails(key, _pdf_bytes):
+    # Cached by the draft hash; the PDF bytes themselves are not hashed
+    return render_thumbnails(_pdf_bytes)
+
+def render_pdf_status(job, polling):
+    if job.pending:
+        st.progress(job.progress, text="Rendering PDF in the background...")
+    elif polling:
+        # Finished since polling started: rerun once to drop run_every
+        st.rerun()
+    elif job.status == "failed":
+        st.error(f"PDF Generation failed: {job.error}")
+    else:
+        st.success("PDF Generated Successfully!")
+        
+        # Preview the first pages as PNGs (or the PDF from the static folder without pypdfium2);
+        # the full document is only transferred by the download button
+        if thumbnails_available():
+            images, page_count = pdf_thumbnails(job.key, job.output)
+            st.caption(f"Preview: first {len(images)} of {page_count} pages")
+            st.image(images)
+        else:
+            pdf_url = publish_static_pdf(job.output, job.key)
+            st.markdown(f'<iframe src="{pdf_url}" width="100%" height="600" type="application/pdf"></iframe>', unsafe_allow_html=True)
+        
+        st.download_button(
+            label="Download PDF",
+            data=job.output,
+            file_name=f"MOM_{st.session_state.mom_data['Header']['Siri'].replace('/', '_')}.pdf",
+            mime="application/pdf"
+        )
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def section_preview(sections, sections_json, starts):
+    """
+    Renders a stage's agenda sections on their own as HTML, numbered from starts
+    (section -> paragraph_counter). Cached by the sections' serialized content and
+    their start numbers, so unchanged previews cost nothing on reruns.
+    """
+    from generate_mom_html import MOMHtml
+    return MOMHtml(data=loads_mom(sections_json)).render_sections(sections, starts=dict(starts))
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def html_preview(mom_bytes, standalone=False):
+    from generate_mom_html import render_html
+    return render_html(loads_mom(mom_bytes), standalone=standalone)
+
+def render_section_preview(*sections):
+    if not st.toggle("👁 Live preview of this section", key=f"preview_{'_'.join(sections)}"):
+        return
+    from generate_mom_html import MOMHtml
+    sections_data = {}
+    for section in sections:
+        sections_data.update(MOMHtml.section_data(st.session_state.mom_data, section))
+    try:
+        # Numbered as in the exported minutes (a numbering-only pass over the whole MOM)
+        starts = MOMHtml(data=st.session_state.mom_data).section_start_numbers()
+        st.html(section_preview(sections, dumps_mom(sections_data, compact=True),
+                                tuple((section, starts[section]) for section in sections)))
+    except Exception as e:
+        st.warning(f"Preview failed: {e}")
+
+STAGE_RENDERERS = [
+    render_initialization,
+    render_header,
+    render_attendance,
+    render_matters_arising,
+    render_main_agenda,
+    render_new_matters,
+    render_export
+]
+STAGE_RENDERERS[current_stage]()
+
 st.divider()
 col_prev, col_next = st.columns([1,1])
 with col_prev:
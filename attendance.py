@@ -0,0 +1,186 @@
+"""
+Attendance lists stored by column.
+
+An Attendance holds one list per field (siri, nama, jawatan, singkatan, sebab) rather
+than a dict per person, with lookups by singkatan and siri. It converts to and from
+the shapes attendance takes elsewhere: lists of per-person dicts (MOM files, session
+state), the legacy column-oriented {"Nama": [...], "Jawatan": [...]} variant and the
+AJK roster DataFrame (ajk.csv). Quorum and per-member attendance rates work on the
+columns directly.
+
+    python attendance.py mom1.json mom2.json ...   # attendance rate per member
+"""
+import sys
+from collections import Counter
+from itertools import compress
+
+from mom_io import load_mom_file
+
+FIELDS = ("siri", "nama", "jawatan", "singkatan", "sebab")
+
+# Roster (ajk.csv) column -> Attendance field
+ROSTER_COLUMNS = {"Siri": "siri", "Nama": "nama", "Jawatan": "jawatan", "Singkatan": "singkatan"}
+
+# Quorum: more than this fraction of the members recorded for the meeting
+QUORUM_FRACTION = 0.5
+
+
+def person_key(singkatan, nama):
+    # Identifies a person across lists and meetings: singkatan, else nama
+    return str(singkatan).strip() or str(nama).strip()
+
+
+class Attendance:
+    """
+    One list per field in FIELDS, all of the same length (missing values are "").
+    The singkatan and siri indexes are built on first lookup.
+    """
+    __slots__ = FIELDS + ("_by_singkatan", "_by_siri")
+
+    def __init__(self, siri=(), nama=(), jawatan=(), singkatan=(), sebab=()):
+        columns = (siri, nama, jawatan, singkatan, sebab)
+        size = max(len(column) for column in columns)
+        for field, column in zip(FIELDS, columns):
+            column = list(column)
+            column.extend([""] * (size - len(column)))
+            setattr(self, field, column)
+        self._by_singkatan = None
+        self._by_siri = None
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        From a list of per-person dicts (lower-case keys) or plain names. siri defaults
+        to the position in the list, counted from 1.
+        """
+        records = [{"nama": r} if isinstance(r, str) else r for r in records or []]
+        return cls(siri=[r.get("siri", str(i + 1)) for i, r in enumerate(records)],
+                   nama=[r.get("nama", "") for r in records],
+                   jawatan=[r.get("jawatan", "") for r in records],
+                   singkatan=[r.get("singkatan", "") for r in records],
+                   sebab=[r.get("sebab", "") for r in records])
+
+    @classmethod
+    def from_columns(cls, data):
+        """
+        From the legacy {"Nama": [...], "Jawatan": [...], ...} dict (keys may be lower
+        case). Rows are numbered from 1 as before; a "Siri" column only overrides the
+        number where it has a value for that row.
+        """
+        def column(field):
+            return data.get(field.capitalize(), data.get(field, [])) or []
+        names = column("nama")
+        siri = column("siri")
+        return cls(siri=[str(siri[i]) if i < len(siri) and siri[i] not in ("", None) else str(i + 1)
+                         for i in range(len(names))],
+                   nama=names, jawatan=column("jawatan")[:len(names)], singkatan=column("singkatan")[:len(names)],
+                   sebab=column("sebab")[:len(names)])
+
+    @classmethod
+    def parse(cls, data):
+        """
+        From any stored shape: a list of dicts or names, the column-oriented dict, or a
+        dict holding the list of dicts under "Nama". Anything else is empty.
+        """
+        if isinstance(data, cls):
+            return data
+        if isinstance(data, list):
+            return cls.from_records(data)
+        if isinstance(data, dict):
+            names = data.get("Nama", data.get("nama", []))
+            if isinstance(names, list) and names and isinstance(names[0], dict):
+                return cls.from_records(names)
+            if isinstance(names, list) and names:
+                return cls.from_columns(data)
+        return cls()
+
+    @classmethod
+    def from_frame(cls, df):
+        # Roster columns as strings, blanks for missing cells or columns
+        frame = df.reindex(columns=list(ROSTER_COLUMNS)).fillna("").astype(str)
+        return cls(**{field: frame[column].tolist() for column, field in ROSTER_COLUMNS.items()})
+
+    def to_records(self, fields=FIELDS):
+        return [dict(zip(fields, row)) for row in zip(*(getattr(self, f) for f in fields))]
+
+    def to_columns(self, fields=FIELDS):
+        return {f.capitalize(): list(getattr(self, f)) for f in fields}
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame({column: getattr(self, field) for column, field in ROSTER_COLUMNS.items()})
+
+    def __len__(self):
+        return len(self.nama)
+
+    def __iter__(self):
+        return iter(self.to_records())
+
+    def select(self, mask):
+        """
+        The people whose entry in mask (a sequence of booleans) is true.
+        """
+        mask = list(mask)
+        return Attendance(*(list(compress(getattr(self, f), mask)) for f in FIELDS))
+
+    def keys(self):
+        return [person_key(s, n) for s, n in zip(self.singkatan, self.nama)]
+
+    def sebab_by_key(self):
+        return {key: sebab for key, sebab in zip(self.keys(), self.sebab) if sebab}
+
+    def record(self, index):
+        return {f: getattr(self, f)[index] for f in FIELDS}
+
+    def by_singkatan(self, singkatan):
+        if self._by_singkatan is None:
+            self._by_singkatan = {str(s).strip(): i for i, s in reversed(list(enumerate(self.singkatan))) if s}
+        index = self._by_singkatan.get(str(singkatan).strip())
+        return None if index is None else self.record(index)
+
+    def by_siri(self, siri):
+        if self._by_siri is None:
+            self._by_siri = {str(s).strip(): i for i, s in reversed(list(enumerate(self.siri))) if s != ""}
+        index = self._by_siri.get(str(siri).strip())
+        return None if index is None else self.record(index)
+
+
+def meeting_attendance(data):
+    """
+    (hadir, tidak_hadir) Attendance of a MOM dict, current or legacy schema.
+    """
+    attn = data.get("Attendance", {})
+    return (Attendance.parse(attn.get("Hadir", data.get("Hadir", []))),
+            Attendance.parse(attn.get("Tidak Hadir", data.get("Tidak_hadir", []))))
+
+
+def quorum_size(members, fraction=QUORUM_FRACTION):
+    # Smallest attendance that is more than fraction of the members
+    return int(members * fraction) + 1 if members else 0
+
+
+def has_quorum(hadir, tidak_hadir, fraction=QUORUM_FRACTION):
+    return len(hadir) >= quorum_size(len(hadir) + len(tidak_hadir), fraction)
+
+
+def attendance_rates(minutes):
+    """
+    {person key: (meetings attended, meetings recorded in)} over an iterable of MOM
+    dicts. People are matched by singkatan, else nama (see Attendance.keys).
+    """
+    attended = Counter()
+    recorded = Counter()
+    for data in minutes:
+        hadir, tidak_hadir = meeting_attendance(data)
+        present = set(hadir.keys())
+        attended.update(present)
+        recorded.update(present | set(tidak_hadir.keys()))
+    recorded.pop("", None)
+    return {key: (attended[key], total) for key, total in recorded.items()}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        rates = attendance_rates(load_mom_file(path) for path in sys.argv[1:])
+        for key, (present, total) in sorted(rates.items(), key=lambda item: (-item[1][0] / item[1][1], item[0])):
+            print(f"{key:<30} {present:>3}/{total:<3} {present / total:>6.0%}")
@@ -0,0 +1,448 @@
+"""
+Benchmark harness for the MOM pipeline.
+
+Generates synthetic MOM JSON at realistic and extreme sizes and times the hot paths:
+ingest_previous_mom, markdown_to_reportlab, flush_annex_table, MOMReportLab.create_pdf,
+the native DOCX export (MOMDocx), the HTML preview (MOMHtml) and, when Quarto is installed, the Quarto (LaTeX) and Typst renders. The Quarto body's
+table rewriting (quarto_body.format_keterangan) is timed on a 10,000-row AJK table.
+With --memory, the peak memory of create_pdf is measured with and without stream mode
+(MOMReportLabStream).
+
+Runs offline: the Groq client is replaced by a canned stub, so the llm_helper timings
+only cover prompt building and response handling.
+
+Cold-start import times of the app and CLIs are measured with `python -X importtime`.
+
+Usage:
+    python bench_mom.py                                # all corpora, results to bench_results.json
+    python bench_mom.py --corpora small,medium --repeat 5
+    python bench_mom.py --baseline bench_baseline.json # exits 1 on regressions
+    python bench_mom.py --corpora small --no-quarto --no-imports
+    python bench_mom.py --corpora medium,large --memory --no-quarto --no-imports
+"""
+import argparse
+import io
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from mom_io import dumps_mom, loads_mom, atomic_write_bytes
+from mom_logic import ingest_previous_mom
+from attendance import attendance_rates
+from generate_mom_reportlab import MOMReportLab, MOMReportLabStream, markdown_to_reportlab
+from generate_mom_docx import MOMDocx
+from generate_mom_html import MOMHtml
+from quarto_body import format_keterangan
+
+# (attendees, matters arising, new matters, annex rows)
+CORPORA = {
+    "small": (10, 5, 3, 20),
+    "medium": (100, 50, 20, 200),
+    "large": (1000, 500, 100, 2000),
+}
+
+DEFAULT_OUTPUT = "bench_results.json"
+DEFAULT_TOLERANCE = 0.25
+
+# Entry points whose cold import is measured, and the heavy packages that should
+# only load in the stages or commands that need them
+IMPORT_TARGETS = ["app", "generate_mom", "generate_mom_reportlab", "llm_helper", "mom_logic", "pdf_jobs"]
+HEAVY_MODULES = ["pandas", "reportlab", "groq", "pypdf", "pypdfium2"]
+
+WORDS = (
+    "mesyuarat ahli jawatankuasa laporan kewangan keahlian projek cadangan kelulusan "
+    "perbelanjaan baki semasa tindakan makluman pelaksanaan program aktiviti sumbangan "
+    "persatuan kelab yuran tahunan dewan peralatan penyelenggaraan jadual tarikh"
+).split()
+
+JAWATAN = ["Presiden", "Naib Presiden", "Setiausaha", "Bendahari", "AJK"]
+
+
+def _sentence(rng, words=12):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text.capitalize() + "."
+
+
+def _keterangan(rng, paragraphs=3):
+    # Mixes the constructs the renderer has to handle: @. paragraph breaks,
+    # a./b. sub-items and **bold**/_italic_ markup
+    parts = []
+    for i in range(paragraphs):
+        text = " ".join(_sentence(rng) for _ in range(rng.randint(1, 3)))
+        if i == 1:
+            text = f"**{rng.choice(WORDS).capitalize()}** {text} _{rng.choice(WORDS)}_"
+        parts.append(text)
+    text = " @. ".join(parts)
+    if rng.random() < 0.3:
+        text += "\n" + "\n".join(f"{chr(97 + j)}. {_sentence(rng, 6)}" for j in range(3))
+    return text
+
+
+def _markdown_table(rng, rows, cols=4):
+    lines = ["| " + " | ".join(f"Lajur {c + 1}" for c in range(cols)) + " |",
+             "|" + "---|" * cols]
+    for r in range(rows):
+        cells = [str(r + 1)] + [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))) for _ in range(cols - 1)]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+
+def make_titled_table(rng, rows, title="SENARAI AHLI JAWATANKUASA"):
+    """
+    Returns a Keterangan with a titled AJK table (| TITLE | | |, separator, Siri/Nama/Jawatan
+    header, rows), the layout format_keterangan rewrites for Quarto.
+    """
+    lines = ["Senarai berikut telah dipersetujui:", f"| {title} | | |", "|---|---|---|",
+             "| Siri | Nama | Jawatan |"]
+    for r in range(rows):
+        lines.append(f"| {r + 1} | {rng.choice(WORDS).capitalize()} bin {rng.choice(WORDS).capitalize()} | "
+                     f"{rng.choice(JAWATAN)} |")
+    lines.append("Jadual di atas dikemas kini setiap tahun.")
+    return "\n".join(lines)
+
+
+def make_synthetic_mom(attendees, matters, new_matters, annex_rows, seed=0):
+    """
+    Returns a MOM dict in the current schema with the given number of attendees,
+    matters arising, new matters and annex table rows. Deterministic for a given seed.
+    """
+    rng = random.Random(seed)
+    people = [{
+        "siri": str(i + 1),
+        "nama": f"{rng.choice(WORDS).capitalize()} bin {rng.choice(WORDS).capitalize()} {i + 1}",
+        "jawatan": JAWATAN[i] if i < len(JAWATAN) else "AJK",
+        "singkatan": f"A{i + 1}",
+    } for i in range(attendees)]
+    absent_count = max(1, attendees // 7)
+    absent = [dict(p, sebab="Urusan rasmi") for p in people[-absent_count:]]
+
+    matters_arising = []
+    for i in range(matters):
+        item = {"Perkara": f"Perkara {i + 1} {rng.choice(WORDS)}",
+                "Keputusan": rng.choice(["Selesai", "Pelaksanaan", "Makluman"]),
+                "Keterangan": _keterangan(rng)}
+        if i % 10 == 9:
+            item["Keterangan"] = _markdown_table(rng, 5)
+        matters_arising.append(item)
+
+    # Annex tables are split into chunks of 50 rows with a caption between them
+    annex_parts = []
+    for chunk in range(0, annex_rows, 50):
+        annex_parts.append(f"Kembaran {chunk // 50 + 1}")
+        annex_parts.append(_markdown_table(rng, min(50, annex_rows - chunk)))
+
+    return {
+        "Header": {"Title": "Mesyuarat Sintetik", "Siri": "3/2026", "Tarikh": "12/03/2026",
+                   "Masa": "10.00 pagi", "Tempat": "Dewan Utama", "Jenis": "exco"},
+        "Attendance": {"Hadir": people[:-absent_count], "Tidak Hadir": absent},
+        "ChairmanAddress": {"Perkara": "UCAPAN PEMBUKAAN OLEH PENGERUSI", "Keterangan": _keterangan(rng, 4)},
+        "ApprovalOfPrevMinutes": {"Perkara": "MENGESAHKAN MINIT MESYUARAT", "Keterangan": _sentence(rng)},
+        "MattersArising": matters_arising,
+        "Reports": {
+            "Financial": {"Perkara": "LAPORAN KEWANGAN", "Keterangan": _keterangan(rng)},
+            "Membership": {"Perkara": "LAPORAN KEAHLIAN", "Keterangan": _keterangan(rng)},
+        },
+        "NewMatters": [{"Perkara": f"Cadangan {i + 1}", "Keterangan": _keterangan(rng, 2),
+                        "Keputusan": rng.choice(["Lulus", "Ditangguhkan"])} for i in range(new_matters)],
+        "Closing": _sentence(rng),
+        "Annex": "\n".join(annex_parts),
+    }
+
+
+class _StubCompletions:
+    async def create(self, model, messages, **kwargs):
+        text = f"Ringkasan luar talian ({len(messages[-1]['content'])} aksara)."
+        message = type("Message", (), {"content": text})()
+        choice = type("Choice", (), {"message": message})()
+        return type("Completion", (), {"choices": [choice]})()
+
+
+class _StubGroq:
+    def __init__(self, api_key=None, **kwargs):
+        self.chat = type("Chat", (), {"completions": _StubCompletions()})()
+
+
+def stub_llm():
+    """
+    Replaces the Groq client in llm_helper with an offline stub returning canned text.
+    """
+    import llm_helper
+    llm_helper.async_groq_client = _StubGroq
+    os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+    return llm_helper
+
+
+def measure(fn, repeat, setup=None):
+    """
+    Runs fn `repeat` times and returns timing stats in seconds.
+    setup (optional) is called before each run, outside the timed region, and its
+    return value is passed to fn.
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        result = fn(arg) if setup else fn()
+        times.append(time.perf_counter() - start)
+    return {"median_s": round(statistics.median(times), 6), "min_s": round(min(times), 6),
+            "max_s": round(max(times), 6), "runs": repeat}, result
+
+
+def bench_corpus(name, data, repeat, quarto=True):
+    results = []
+    raw = dumps_mom(data, compact=True)
+
+    def add(bench, stats, **extra):
+        entry = {"name": bench, "corpus": name, **stats, **extra}
+        results.append(entry)
+        print(f"  {bench:<32} {entry['median_s'] * 1000:>10.2f} ms  (min {entry['min_s'] * 1000:.2f})")
+
+    stats, _ = measure(ingest_previous_mom, repeat, setup=lambda: loads_mom(raw))
+    add("ingest_previous_mom", stats)
+
+    # A year of monthly meetings with this attendance
+    stats, _ = measure(lambda: attendance_rates([data] * 12), repeat)
+    add("attendance_rates", stats, meetings=12)
+
+    texts = [item["Keterangan"] for item in data["MattersArising"] + data["NewMatters"]]
+    texts += data["Annex"].split("\n")
+    stats, _ = measure(lambda: [markdown_to_reportlab(t) for t in texts], repeat)
+    add("markdown_to_reportlab", stats, calls=len(texts))
+
+    renderer = MOMReportLab(output_pdf=io.BytesIO(), data=data)
+    annex_lines = [line for line in data["Annex"].split("\n") if line.startswith("|")]
+    stats, _ = measure(lambda: renderer.flush_annex_table([], annex_lines), repeat)
+    add("flush_annex_table", stats, rows=len(annex_lines))
+
+    def render_pdf():
+        buf = io.BytesIO()
+        MOMReportLab(output_pdf=buf, data=data).create_pdf()
+        return buf.getbuffer().nbytes
+    stats, size = measure(render_pdf, repeat)
+    add("MOMReportLab.create_pdf", stats, pdf_bytes=size)
+
+    for profile in ("compact", "batch"):
+        def render_profile_pdf():
+            buf = io.BytesIO()
+            MOMReportLab(output_pdf=buf, data=data, profile=profile).create_pdf()
+            return buf.getbuffer().nbytes
+        stats, size = measure(render_profile_pdf, repeat)
+        add(f"MOMReportLab.create_pdf.{profile}", stats, pdf_bytes=size)
+
+    def render_stream_pdf():
+        buf = io.BytesIO()
+        MOMReportLabStream(output_pdf=buf, data=data).create_pdf()
+        return buf.getbuffer().nbytes
+    stats, size = measure(render_stream_pdf, repeat)
+    add("MOMReportLabStream.create_pdf", stats, pdf_bytes=size)
+
+    stats, docx_bytes = measure(lambda: MOMDocx(data=data).to_bytes(), repeat)
+    add("MOMDocx.to_bytes", stats, docx_bytes=len(docx_bytes))
+
+    stats, html = measure(lambda: MOMHtml(data=data).render(), repeat)
+    add("MOMHtml.render", stats, html_chars=len(html))
+
+    if quarto:
+        bench_quarto(name, raw, add)
+    return results
+
+
+def bench_memory(name, data):
+    """
+    Peak traced memory (tracemalloc) of one create_pdf with the whole story built up
+    front and in stream mode. Tracing slows the runs several times, so their timings
+    only compare with other --memory runs.
+    """
+    results = []
+    for mode, renderer in (("list", MOMReportLab), ("stream", MOMReportLabStream)):
+        def render_pdf():
+            buf = io.BytesIO()
+            renderer(output_pdf=buf, data=data).create_pdf()
+            return buf.getbuffer().nbytes
+        tracemalloc.start()
+        try:
+            stats, size = measure(render_pdf, 1)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        results.append({"name": f"create_pdf.peak_memory.{mode}", "corpus": name, **stats,
+                        "peak_mb": round(peak / 1e6, 2), "pdf_bytes": size})
+        print(f"  {results[-1]['name']:<32} {peak / 1e6:>10.2f} MB  ({stats['median_s']:.2f} s traced)")
+    return results
+
+
+def bench_quarto(name, raw, add):
+    import generate_mom
+    if not os.path.exists(generate_mom.QUARTO_PATH):
+        print(f"  quarto/typst                     skipped ({generate_mom.QUARTO_PATH} not found)")
+        return
+
+    # Quarto renders are slow; a single run each is enough to spot regressions
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = atomic_write_bytes(os.path.join(tmp, f"bench_{name}.json"), raw)
+        for bench, fmt in (("quarto.pdf", "pdf"), ("quarto.typst", "typst")):
+            out = os.path.join(tmp, f"bench_{name}_{fmt}.pdf")
+            stats, result = measure(lambda: generate_mom.generate_mom(json_path, fmt, out), 1)
+            add(bench, stats, returncode=getattr(result, "returncode", None))
+
+
+def bench_format_keterangan(repeat, rows=10000):
+    text = make_titled_table(random.Random(0), rows)
+    results = []
+    for target in ("latex", "typst"):
+        stats, _ = measure(lambda: format_keterangan(text, target), repeat)
+        results.append({"name": f"format_keterangan.{target}", "corpus": f"table_{rows}", **stats, "rows": rows})
+        print(f"  {results[-1]['name']:<32} {stats['median_s'] * 1000:>10.2f} ms  (min {stats['min_s'] * 1000:.2f})")
+    return results
+
+
+def bench_llm(repeat):
+    llm_helper = stub_llm()
+    points = [_sentence(random.Random(i)) for i in range(10)]
+    results = []
+    for fn in (llm_helper.generate_chairman_note, llm_helper.generate_closing_remark,
+               llm_helper.generate_new_matter):
+        stats, _ = measure(lambda: fn(points), repeat)
+        results.append({"name": f"llm_helper.{fn.__name__}", "corpus": "stub", **stats})
+        print(f"  {results[-1]['name']:<32} {stats['median_s'] * 1000:>10.2f} ms  (stubbed)")
+    return results
+
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def import_profile(module):
+    """
+    Imports `module` in a fresh interpreter with -X importtime. Returns the cumulative
+    import time in seconds and {top-level package: cumulative seconds} for every package
+    it pulled in.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    packages = {}
+    total = None
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, name = int(match.group(2)) / 1e6, match.group(4)
+        top = name.split(".")[0]
+        packages[top] = max(packages.get(top, 0.0), cumulative)
+        if name == module and not match.group(3):
+            total = cumulative
+    if total is None:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    return total, packages
+
+
+def bench_imports(repeat):
+    results = []
+    for module in IMPORT_TARGETS:
+        runs = [import_profile(module) for _ in range(repeat)]
+        totals = [total for total, _ in runs]
+        heavy = sorted(m for m in HEAVY_MODULES if m in runs[0][1])
+        slowest = sorted(runs[0][1].items(), key=lambda kv: kv[1], reverse=True)
+        slowest = [(name, round(t, 4)) for name, t in slowest if name != module][:5]
+        results.append({"name": f"import.{module}", "corpus": "cold_start",
+                        "median_s": round(statistics.median(totals), 6), "min_s": round(min(totals), 6),
+                        "max_s": round(max(totals), 6), "runs": repeat,
+                        "heavy_modules": heavy, "slowest_packages": slowest})
+        print(f"  {'import ' + module:<32} {results[-1]['median_s'] * 1000:>10.2f} ms  "
+              f"heavy: {', '.join(heavy) or '-'}")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns the benchmarks whose median is more than `tolerance` (a fraction) slower
+    than the same benchmark in the baseline run.
+    """
+    base = {(r["name"], r["corpus"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        old = base.get((r["name"], r["corpus"]))
+        if not old or not old["median_s"]:
+            continue
+        ratio = r["median_s"] / old["median_s"]
+        r["baseline_median_s"] = old["median_s"]
+        r["ratio"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append(r)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the MOM pipeline on synthetic corpora.")
+    parser.add_argument("--corpora", default=",".join(CORPORA),
+                        help=f"comma-separated corpus sizes ({', '.join(CORPORA)})")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark (median is reported)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="results JSON file")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown vs baseline as a fraction (default 0.25)")
+    parser.add_argument("--no-quarto", action="store_true", help="skip the Quarto/Typst renders")
+    parser.add_argument("--no-imports", action="store_true", help="skip the cold-start import report")
+    parser.add_argument("--memory", action="store_true",
+                        help="also measure peak memory of create_pdf, list vs stream mode (slow)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.corpora.split(","):
+        if name not in CORPORA:
+            parser.error(f"unknown corpus {name!r}")
+        attendees, matters, new_matters, annex_rows = CORPORA[name]
+        print(f"[{name}] {attendees} attendees, {matters} matters arising, {annex_rows} annex rows")
+        data = make_synthetic_mom(attendees, matters, new_matters, annex_rows, seed=args.seed)
+        results.extend(bench_corpus(name, data, args.repeat, quarto=not args.no_quarto))
+        if args.memory:
+            results.extend(bench_memory(name, data))
+
+    print("[quarto_body] 10,000-row titled AJK table")
+    results.extend(bench_format_keterangan(args.repeat))
+
+    print("[llm] offline stub")
+    results.extend(bench_llm(args.repeat))
+
+    if not args.no_imports:
+        print("[imports] python -X importtime, fresh interpreter per run")
+        results.extend(bench_imports(args.repeat))
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "rb") as f:
+            regressions = compare(results, loads_mom(f.read()), args.tolerance)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "corpora": {name: CORPORA[name] for name in args.corpora.split(",")},
+        "results": results,
+        "baseline": args.baseline,
+        "regressions": [(r["name"], r["corpus"], r["ratio"]) for r in regressions],
+    }
+    atomic_write_bytes(args.output, dumps_mom(report))
+    print(f"Results written to {args.output}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.tolerance:.0%}:")
+        for r in regressions:
+            print(f"  {r['name']} [{r['corpus']}]: {r['baseline_median_s'] * 1000:.2f} ms -> "
+                  f"{r['median_s'] * 1000:.2f} ms (x{r['ratio']})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,30 @@
 import subprocess
 import os
 import sys
-import json
+import tempfile
+from mom_io import load_mom_file
+from quarto_body import render_body
+import instrumentation
 
 QUARTO_PATH = "/usr/share/positron/resources/app/quarto/bin/quarto"
 
+# Quarto progress lines that start each render phase (used when profiling is enabled)
+QUARTO_PHASE_MARKERS = [
+    (r"^pandoc", "pandoc"),
+    (r"^Rendering PDF|^running (pdf|xe|lua)latex|^\[typst\]|typst compile", "compile"),
+    (r"^Output created", "finish"),
+]
+
 def generate_mom(json_path, output_format="pdf", output_file=None):
     if not os.path.exists(json_path):
         print(f"Error: {json_path} not found.")
         return
 
     # Extract some metadata for the Quarto render
-    with open(json_path, 'r') as f:
-        data = json.load(f)
-    
-    if isinstance(data, list) and len(data) > 0:
-        data = data[0]
-    
-    if not isinstance(data, dict):
-        print(f"Error: Invalid JSON structure in {json_path}. Expected dict or list of dicts.")
+    try:
+        data = load_mom_file(json_path)
+    except ValueError as e:
+        print(f"Error: {e} ({json_path})")
         return
     
     siri = data.get("Siri", "N/A")
@@ -51,14 +57,20 @@ def generate_mom(json_path, output_format="pdf", output_file=None):
 
     # Quarto's --output flag does not like absolute paths.
     local_output = f"temp_output.{ext}"
-    
-    env = os.environ.copy()
-    env["MOM_JSON_FILE"] = os.path.abspath(json_path)
+
+    # The body is generated here and appended to the template's front matter, so Quarto
+    # renders a static document and never starts a Jupyter kernel
+    with open(template, encoding="utf-8") as f:
+        front_matter = f.read()
+    template_dir = os.path.dirname(os.path.abspath(template))
+    fd, document = tempfile.mkstemp(prefix="mom_render_", suffix=".qmd", dir=template_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(front_matter + "\n" + render_body(data, "typst" if output_format == "typst" else "latex"))
 
     cmd = [
         QUARTO_PATH,
         "render",
-        template,
+        os.path.basename(document),
         "--to", quarto_format,
         "--output", local_output,
         "-M", f"siri:{siri}",
@@ -69,7 +81,14 @@ def generate_mom(json_path, output_format="pdf", output_file=None):
     ]
 
     print(f"Running: {' '.join(cmd)}")
-    result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    try:
+        if instrumentation.is_enabled():
+            with instrumentation.profiled("quarto.generate_mom"):
+                result = instrumentation.run_with_phases(cmd, QUARTO_PHASE_MARKERS, "quarto")
+        else:
+            result = subprocess.run(cmd, capture_output=True, text=True)
+    finally:
+        os.remove(document)
 
     if result.returncode == 0:
         if os.path.exists(local_output):
@@ -0,0 +1,220 @@
+"""
+Compendium renderer: many minutes bound into one PDF, e.g. every EXCO meeting of the
+year for the AGM.
+
+MOMCompendium lays the meetings out in a single doc.build with a contents page, an
+outline bookmark per meeting and page numbers running through the whole volume
+(add_page_number). Each meeting is built in stream mode (MOMReportLabStream) when the
+layout reaches it, so memory stays at about one meeting's data plus the flowables
+being laid out, however many meetings there are. Shared assets are written to the file once: images are
+deduplicated by ReportLab, and with the "batch" profile the letterhead and signature
+block are form XObjects stamped on every meeting.
+
+    python generate_mom_compendium.py output.pdf mom1.json mom2.json ...
+    python generate_mom_compendium.py output.pdf minutes_dir/
+"""
+import glob
+import os
+import sys
+from functools import partial
+
+from reportlab.lib.units import mm
+from reportlab.platypus import (BaseDocTemplate, Flowable, NextPageTemplate, PageBreak, Paragraph, Table,
+                                TableStyle)
+
+from generate_mom_reportlab import (MOMReportLab, MOMReportLabStream, StreamingDocTemplate, StreamingStory,
+                                    stream_encoding)
+from mom_io import load_mom_file, validate_mom
+from instrumentation import phase, profiled
+
+# Contents table columns: number, meeting, page
+CONTENTS_COL_WIDTHS = (10*mm, 15*mm)
+
+
+class CanvasCall(Flowable):
+    """
+    Zero-size flowable that calls fn(canvas) where it is drawn, e.g. to bookmark the
+    page a meeting starts on.
+    """
+    def __init__(self, fn):
+        super().__init__()
+        self.fn = fn
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        self.fn(self.canv)
+
+
+class ContentsPage(Flowable):
+    """
+    Space for one page of the contents table. Page numbers are only known once every
+    meeting is laid out, so this draws a form that MOMCompendium.write_contents defines
+    at the end of the build, and links each row to its meeting's bookmark.
+    """
+    def __init__(self, name, width, row_heights, keys):
+        super().__init__()
+        self.name = name
+        self.width = width
+        self.height = sum(row_heights)
+        self.row_heights = row_heights
+        self.keys = keys
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        canvas = self.canv
+        canvas.doForm(self.name)
+        top = self.height
+        for key, height in zip(self.keys, self.row_heights):
+            canvas.linkRect("", key, (0, top - height, self.width, top), relative=1)
+            top -= height
+
+
+def expand_sources(args):
+    # Directories stand for the MOM JSON files they contain, in name order
+    sources = []
+    for arg in args:
+        if os.path.isdir(arg):
+            sources.extend(sorted(glob.glob(os.path.join(arg, "*.json"))))
+        else:
+            sources.append(arg)
+    return sources
+
+
+class MOMCompendium(MOMReportLab):
+    """
+    Binds several minutes into one PDF. sources are MOM JSON paths or MOM dicts, in
+    the order they appear in the volume; each meeting keeps its own paragraph numbering.
+    """
+    PHASE_PREFIX = "compendium"
+    TITLE = "KOMPENDIUM MINIT MESYUARAT"
+    DOC_TEMPLATE = StreamingDocTemplate
+
+    def __init__(self, sources, output_pdf="compendium.pdf", profile=None, title=None):
+        super().__init__(output_pdf=output_pdf, data={}, profile=profile)
+        self.sources = list(sources)
+        if not self.sources:
+            raise ValueError("No minutes to bind.")
+        self.title = title or self.TITLE
+        # meeting index -> page it starts on, filled in during the build
+        self.start_pages = {}
+        self.contents = []
+
+    def meeting_renderer(self, source):
+        # Stream mode: a meeting's flowables are made as the layout reaches them
+        data = load_mom_file(source) if isinstance(source, str) else validate_mom(source)
+        return MOMReportLabStream(data=data, profile=self.profile_name)
+
+    def create_pdf(self, progress_callback=None):
+        with profiled("compendium.create_pdf"):
+            with phase("compendium.contents", meetings=len(self.sources)):
+                # Only the header lines are kept; meetings are loaded again when laid out
+                titles = [self.meeting_renderer(source).header_lines() for source in self.sources]
+            doc = self.make_doc(self.output_pdf, title=self.title)
+            # Sets self.letterhead with stamp_assets; otherwise each meeting has its logo
+            self.add_logo([], 'logo.png')
+            first, later = self.page_templates(doc)
+            doc.addPageTemplates([later, first])
+
+            story = StreamingStory(self.stream_story(doc, titles, progress_callback))
+            with phase("compendium.build", meetings=len(self.sources)) as info, \
+                    stream_encoding(self.profile["ascii85"]):
+                BaseDocTemplate.build(doc, story)
+                info["flowables"] = story.taken
+                info["pages"] = doc.page
+            return self.output_pdf
+
+    def stream_story(self, doc, titles, progress_callback=None):
+        """
+        Yields the volume: contents pages, then each meeting, whose story is built when
+        the layout gets to it, and finally the contents forms.
+        """
+        yield from self.contents_story(doc, titles)
+        if progress_callback:
+            progress_callback('SIZE_EST', len(self.sources))
+        for index, source in enumerate(self.sources):
+            yield NextPageTemplate('First')
+            yield PageBreak()
+            yield CanvasCall(partial(self.start_meeting, index, " ".join(titles[index][:2])))
+            yield from self.meeting_renderer(source).iter_story()
+            if progress_callback:
+                progress_callback('PROGRESS', index + 1)
+        yield CanvasCall(partial(self.write_contents, doc, titles))
+
+    def start_meeting(self, index, title, canvas):
+        key = f"meeting{index}"
+        canvas.bookmarkPage(key)
+        canvas.addOutlineEntry(title, key, level=0)
+        self.start_pages[index] = canvas.getPageNumber()
+
+    def contents_table(self, titles, start, end, pages=None):
+        number_width, page_width = CONTENTS_COL_WIDTHS
+        rows = [[f"{index + 1}.",
+                 Paragraph(f"<b>{titles[index][0]}</b><br/>{titles[index][1]}", self.styles['MOM_TableText']),
+                 str(pages[index]) if pages else "000"]
+                for index in range(start, end)]
+        table = Table(rows, colWidths=[number_width, self.contents_width - number_width - page_width, page_width])
+        table.setStyle(TableStyle([
+            ('FONT', (0, 0), (-1, -1), self.fonts.get('Helvetica', 'Helvetica'), 9),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('ALIGN', (-1, 0), (-1, -1), 'RIGHT'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ]))
+        return table
+
+    def contents_story(self, doc, titles):
+        """
+        Yields the title and contents pages. Rows are split over pages using their
+        heights with placeholder page numbers, which the real numbers match.
+        """
+        self.contents_width = doc.width - 12  # frame padding
+        heading = []
+        self.add_paragraph(heading, self.title, 'MOM_HeaderBlock')
+        self.add_spacer(heading, 10)
+        self.add_paragraph(heading, "KANDUNGAN", 'MOM_SectionHeader')
+        used = sum(f.wrap(self.contents_width, doc.height)[1] + f.getSpaceBefore() + f.getSpaceAfter()
+                   for f in heading)
+        yield CanvasCall(self.bookmark_contents)
+        yield from heading
+
+        table = self.contents_table(titles, 0, len(titles))
+        table.wrap(self.contents_width, doc.height)
+        frame_height = doc.height - 12
+        start = 0
+        for index, height in enumerate(table._rowHeights):
+            if used + height > frame_height and index > start:
+                self.contents.append((start, index))
+                start, used = index, 0
+            used += height
+        self.contents.append((start, len(titles)))
+
+        for page, (start, end) in enumerate(self.contents):
+            if page:
+                yield PageBreak()
+            yield ContentsPage(f"MOMContents{page}", self.contents_width, table._rowHeights[start:end],
+                               [f"meeting{index}" for index in range(start, end)])
+
+    def bookmark_contents(self, canvas):
+        canvas.bookmarkPage("contents")
+        canvas.addOutlineEntry("KANDUNGAN", "contents", level=0)
+        canvas.showOutline()
+
+    def write_contents(self, doc, titles, canvas):
+        # Drawn last: every start page is known, and the forms were referenced already
+        for page, (start, end) in enumerate(self.contents):
+            table = self.contents_table(titles, start, end, self.start_pages)
+            width, height = table.wrap(self.contents_width, doc.height)
+            canvas.beginForm(f"MOMContents{page}", 0, 0, width, height)
+            table.drawOn(canvas, 0, 0)
+            canvas.endForm()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print(MOMCompendium(expand_sources(sys.argv[2:]), output_pdf=sys.argv[1]).create_pdf())
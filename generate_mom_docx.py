@@ -0,0 +1,246 @@
+"""
+Native DOCX export with python-docx, without Quarto or Pandoc.
+
+MOMDocx reuses MOMReportLab's section logic through its add_* primitives, so agenda
+sections, @. paragraph numbering, a./b. sub-items, markdown tables and attendance
+tables match the ReportLab PDF. The document is written in-process to a path or a
+file-like object.
+
+    python generate_mom_docx.py mom.json [output.docx]
+"""
+import os
+import re
+import sys
+from contextlib import contextmanager
+from html import escape
+from io import BytesIO
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import nsdecls, qn
+from docx.shared import Mm, Pt
+
+from generate_mom_reportlab import MOMReportLab, markdown_to_reportlab, markup_runs
+from instrumentation import phase, profiled
+
+FONT = "Arial"
+
+# Control characters XML 1.0 does not allow
+XML_INVALID = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Word counterparts of the MOMReportLab paragraph styles
+STYLES = {
+    "MOM_HeaderBlock": dict(size=11, bold=True, align=WD_ALIGN_PARAGRAPH.CENTER, leading=14),
+    "MOM_SectionHeader": dict(size=11, bold=True, before=12, after=6, keep_with_next=True),
+    "MOM_Normal": dict(size=10, leading=12, after=6, align=WD_ALIGN_PARAGRAPH.JUSTIFY),
+    "MOM_AnnexHeader": dict(size=12, bold=True, before=20, after=15, keep_with_next=True),
+    "MOM_TableText": dict(size=9, leading=11),
+    "MOM_Indented": dict(size=10, leading=12, after=6, indent=24, align=WD_ALIGN_PARAGRAPH.JUSTIFY),
+}
+
+
+def xml_text(text):
+    """
+    Text as parse_xml accepts it. Word's manual line and page breaks (\\x0b, \\x0c),
+    common in pasted or PDF-extracted text, become line breaks; other control
+    characters are dropped.
+    """
+    return XML_INVALID.sub(lambda m: "\n" if m.group() in "\x0b\x0c" else "", text)
+
+
+def runs_xml(markup):
+    """
+    WordprocessingML for the runs of one paragraph. Paragraphs and table rows are
+    built as XML strings and parsed once: python-docx's element-by-element API costs
+    several times the rest of the export on large minutes.
+    """
+    out = []
+    for text, bold, italic, underline in markup_runs(markup):
+        props = ("<w:b/>" if bold else "") + ("<w:i/>" if italic else "") + \
+            ('<w:u w:val="single"/>' if underline else "")
+        lines = "<w:br/>".join(f'<w:t xml:space="preserve">{escape(line)}</w:t>'
+                               for line in xml_text(text).split("\n"))
+        out.append(f"<w:r><w:rPr>{props}</w:rPr>{lines}</w:r>" if props else f"<w:r>{lines}</w:r>")
+    return "".join(out)
+
+
+def paragraph_xml(markup, style_id):
+    return (f'<w:p {nsdecls("w")}><w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>'
+            f'{runs_xml(markup)}</w:p>')
+
+
+# Bottom rule under a table's first row, like the 0.5pt LINEBELOW of the ReportLab tables
+HEADER_RULE = '<w:tcBorders><w:bottom w:val="single" w:sz="4" w:color="000000"/></w:tcBorders>'
+
+
+def add_page_number_field(paragraph):
+    field = OxmlElement("w:fldSimple")
+    field.set(qn("w:instr"), "PAGE")
+    run = OxmlElement("w:r")
+    text = OxmlElement("w:t")
+    text.text = "1"
+    run.append(text)
+    field.append(run)
+    paragraph._p.append(field)
+
+
+class MOMDocx(MOMReportLab):
+    """
+    Writes the minutes as DOCX. The story passed to the build_* methods is the
+    python-docx Document itself.
+    """
+    PHASE_PREFIX = "docx"
+
+    def __init__(self, json_path=None, output_docx=None, data=None):
+        # output_docx may also be a file-like object (e.g. BytesIO)
+        super().__init__(json_path=json_path, output_pdf=output_docx, data=data)
+        if not output_docx:
+            base = os.path.splitext(os.path.basename(json_path))[0] if json_path else "mom"
+            output_docx = f"{base}.docx"
+        self.output_docx = output_docx
+
+    def make_document(self):
+        doc = Document()
+        section = doc.sections[0]
+        section.page_width, section.page_height = Mm(210), Mm(297)
+        section.left_margin = section.right_margin = Mm(20)
+        section.top_margin = section.bottom_margin = Mm(20)
+        footer = section.footer.paragraphs[0]
+        footer.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        add_page_number_field(footer)
+
+        # python-docx resolves style names by scanning every style on each use, so
+        # paragraphs get the style id directly (see set_style)
+        self.style_ids = {}
+        normal = doc.styles["Normal"]
+        normal.font.name = FONT
+        normal.font.size = Pt(10)
+        for name, spec in STYLES.items():
+            style = doc.styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+            style.base_style = normal
+            style.font.size = Pt(spec["size"])
+            style.font.bold = spec.get("bold")
+            fmt = style.paragraph_format
+            fmt.space_before = Pt(spec.get("before", 0))
+            fmt.space_after = Pt(spec.get("after", 0))
+            if "leading" in spec:
+                fmt.line_spacing = Pt(spec["leading"])
+            if "align" in spec:
+                fmt.alignment = spec["align"]
+            if "indent" in spec:
+                fmt.left_indent = Pt(spec["indent"])
+            fmt.keep_with_next = spec.get("keep_with_next")
+            self.style_ids[name] = style.style_id
+        return doc
+
+    def create_docx(self):
+        with profiled("docx.create_docx"):
+            doc = self.make_document()
+            self.build_story(doc)
+            with phase("docx.save"):
+                doc.save(self.output_docx)
+            return self.output_docx
+
+    def to_bytes(self):
+        self.output_docx = BytesIO()
+        return self.create_docx().getvalue()
+
+    # Output primitives (see MOMReportLab)
+
+    def add_paragraph(self, story, text, style='MOM_Normal'):
+        # Inserted ahead of the body's closing section properties, like Document.add_paragraph
+        story.element.body.sectPr.addprevious(parse_xml(paragraph_xml(text, self.style_ids[style])))
+
+    def add_spacer(self, story, height):
+        spacer = story.add_paragraph().paragraph_format
+        spacer.space_after = Pt(height)
+        spacer.line_spacing = Pt(1)
+
+    def add_page_break(self, story):
+        story.add_page_break()
+
+    @contextmanager
+    def kept_together(self, story):
+        start = len(story.paragraphs)
+        yield story
+        for paragraph in story.paragraphs[start:-1]:
+            paragraph.paragraph_format.keep_with_next = True
+
+    def story_size(self, story):
+        return len(story.element.body)
+
+    def add_logo(self, story, logo_path):
+        if os.path.exists(logo_path):
+            story.add_picture(logo_path, width=Mm(160))
+            story.paragraphs[-1].alignment = WD_ALIGN_PARAGRAPH.CENTER
+            self.add_spacer(story, 5)
+
+    def add_table(self, story, headers, rows, col_widths, header_rule=False):
+        table = story.add_table(rows=0, cols=len(col_widths))
+        table.autofit = False
+        table.alignment = WD_TABLE_ALIGNMENT.CENTER
+        for column, width in zip(table.columns, col_widths):
+            column.width = Pt(width)
+
+        # All rows are parsed as one XML fragment (see runs_xml)
+        style_id = self.style_ids["MOM_TableText"]
+        widths = [f'<w:tcW w:w="{Pt(w).twips}" w:type="dxa"/>' for w in col_widths]
+        trs = []
+        for index, values in enumerate(([headers] if headers else []) + rows):
+            rule = HEADER_RULE if index == 0 and header_rule else ""
+            cells = list(values[:len(widths)]) + [""] * (len(widths) - len(values))
+            trs.append("<w:tr>" + "".join(
+                f'<w:tc><w:tcPr>{width}{rule}</w:tcPr><w:p><w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>'
+                f'{runs_xml(value)}</w:p></w:tc>'
+                for width, value in zip(widths, cells)) + "</w:tr>")
+        table._tbl.extend(parse_xml(f'<w:tbl {nsdecls("w")}>{"".join(trs)}</w:tbl>'))
+        return table
+
+    def flush_annex_table(self, story, current_table):
+        with phase("docx.table", rows=len(current_table)):
+            raw_table_data = self.table_rows(current_table)
+            if not raw_table_data:
+                return
+            col_widths = self.table_col_widths(raw_table_data)
+            num_cols = len(col_widths)
+            rows = [[markdown_to_reportlab(c) for c in row[:num_cols]] for row in raw_table_data]
+            self.add_table(story, None, rows, col_widths, header_rule=True)
+
+    def add_attendance_table(self, story, attendance_list, includes_excuse=False):
+        if not attendance_list:
+            self.add_paragraph(story, "Tiada rekod.")
+            return
+        headers, rows = self.attendance_rows(attendance_list, includes_excuse)
+        self.add_table(story, [f"<b>{h}</b>" for h in headers], rows,
+                       self.ATTENDANCE_COL_WIDTHS[includes_excuse])
+
+    def add_signature_table(self, story, signatories):
+        table = story.add_table(rows=3, cols=len(signatories))
+        table.autofit = False
+        col_width = Pt(self.signature_col_width(len(signatories)))
+        for column in table.columns:
+            column.width = col_width
+        style_id = self.style_ids["MOM_Normal"]
+        labels, images, names = table.rows
+        for i, (label, path, name) in enumerate(signatories):
+            label_cell, image_cell, name_cell = labels.cells[i], images.cells[i], names.cells[i]
+            for cell, markup in ((label_cell, f"<b>{label}</b>"), (name_cell, name)):
+                cell.width = col_width
+                cell._tc.replace(cell.paragraphs[0]._p, parse_xml(paragraph_xml(markup, style_id)))
+            image_cell.width = col_width
+            if os.path.exists(path):
+                image_cell.paragraphs[0].add_run().add_picture(path, width=Mm(40), height=Mm(20))
+            else:
+                image_cell.paragraphs[0].paragraph_format.space_after = Mm(20)
+        # Keep the block on one page
+        for paragraph in (cell.paragraphs[0] for row in (labels, images) for cell in row.cells):
+            paragraph.paragraph_format.keep_with_next = True
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        output = sys.argv[2] if len(sys.argv) > 2 else None
+        print(MOMDocx(sys.argv[1], output_docx=output).create_docx())
@@ -0,0 +1,173 @@
+"""
+HTML renderer for instant previews and browser printing of the minutes.
+
+MOMHtml reuses MOMReportLab's section logic through its add_* primitives (like
+MOMDocx), collecting plain blocks that mom_template.html lays out with print CSS:
+header block, HADIR/TIDAK HADIR tables, numbered agendas, signatures and annexes.
+The template is compiled once per process; a render takes a few milliseconds.
+
+    python generate_mom_html.py mom.json [output.html]
+"""
+import base64
+import mimetypes
+import os
+import sys
+from contextlib import contextmanager
+from functools import lru_cache
+
+from jinja2 import Environment, FileSystemLoader
+from markupsafe import Markup, escape
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+
+from generate_mom_reportlab import MOMReportLab, markdown_to_reportlab, markup_runs
+from instrumentation import phase, profiled
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE = "mom_template.html"
+
+# Table widths are given relative to the text width, as in the PDF
+TEXT_WIDTH = A4[0] - 40*mm
+
+# auto_reload off: the compiled template is never re-checked against the file
+_env = Environment(loader=FileSystemLoader(BASE_DIR), autoescape=True, auto_reload=False)
+
+
+@lru_cache(maxsize=None)
+def get_template():
+    return _env.get_template(TEMPLATE)
+
+
+@lru_cache(maxsize=8)
+def image_data_uri(path):
+    # Images are inlined so the HTML works in st.html and as a standalone file
+    if not os.path.exists(path):
+        return None
+    mime = mimetypes.guess_type(path)[0] or "image/png"
+    with open(path, "rb") as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode('ascii')}"
+
+
+def markup_html(markup):
+    """
+    Converts ReportLab paragraph markup to safe HTML: <b>, <i>, <u> and line breaks are
+    kept, everything else in the text is escaped.
+    """
+    out = []
+    for text, bold, italic, underline in markup_runs(markup):
+        html = str(escape(text)).replace("\n", "<br>")
+        if underline:
+            html = f"<u>{html}</u>"
+        if italic:
+            html = f"<i>{html}</i>"
+        if bold:
+            html = f"<b>{html}</b>"
+        out.append(html)
+    return Markup("".join(out))
+
+
+def width_percentages(col_widths):
+    return [round(w / TEXT_WIDTH * 100, 2) for w in col_widths]
+
+
+class MOMHtml(MOMReportLab):
+    """
+    Renders the minutes as HTML. The story is a list of block dicts
+    (kind: paragraph, spacer, page_break, group, logo, table or signatures).
+    """
+    PHASE_PREFIX = "html"
+
+    def __init__(self, json_path=None, data=None):
+        super().__init__(json_path=json_path, data=data)
+
+    def render(self, standalone=True):
+        """
+        Returns the minutes as an HTML page, or with standalone=False as a fragment
+        (style and content only) for embedding, e.g. with st.html.
+        """
+        with profiled("html.render"):
+            story = []
+            self.build_story(story)
+            with phase("html.template", blocks=len(story)):
+                return get_template().render(
+                    blocks=story, standalone=standalone, title=self.header_lines()[0])
+
+    def render_sections(self, sections, standalone=False, starts=None):
+        """
+        Renders only the given SECTIONS, in that order, for the live section previews.
+        Each section is numbered from where it starts in the whole minutes: starts maps
+        sections to their paragraph_counter, as from section_start_numbers (the default,
+        which needs the full MOM in data).
+        """
+        if starts is None:
+            starts = self.section_start_numbers()
+        story = []
+        for section in sections:
+            self.paragraph_counter = starts[section]
+            self.build_section(story, section)
+        # A section that starts on a new page would otherwise open with a break
+        while story and story[0]["kind"] == "page_break":
+            story.pop(0)
+        if not story:
+            self.add_paragraph(story, "Tiada.")
+        return get_template().render(blocks=story, standalone=standalone, title=", ".join(sections))
+
+    # Output primitives (see MOMReportLab)
+
+    def add_paragraph(self, story, text, style='MOM_Normal'):
+        story.append({"kind": "paragraph", "style": style, "html": markup_html(text)})
+
+    def add_spacer(self, story, height):
+        story.append({"kind": "spacer", "height": height})
+
+    def add_page_break(self, story):
+        story.append({"kind": "page_break"})
+
+    @contextmanager
+    def kept_together(self, story):
+        blocks = []
+        yield blocks
+        story.append({"kind": "group", "blocks": blocks})
+
+    def add_logo(self, story, logo_path):
+        src = image_data_uri(logo_path)
+        if src:
+            story.append({"kind": "logo", "src": src})
+
+    def flush_annex_table(self, story, current_table):
+        with phase("html.table", rows=len(current_table)):
+            raw_table_data = self.table_rows(current_table)
+            if not raw_table_data:
+                return
+            col_widths = self.table_col_widths(raw_table_data)
+            rows = [[markup_html(markdown_to_reportlab(c)) for c in row[:len(col_widths)]]
+                    for row in raw_table_data]
+            story.append({"kind": "table", "css": "markdown", "headers": None, "rows": rows,
+                          "widths": width_percentages(col_widths)})
+
+    def add_attendance_table(self, story, attendance_list, includes_excuse=False):
+        if not attendance_list:
+            self.add_paragraph(story, "Tiada rekod.")
+            return
+        headers, rows = self.attendance_rows(attendance_list, includes_excuse)
+        story.append({"kind": "table", "css": "attendance", "headers": headers,
+                      "rows": [[markup_html(cell) for cell in row] for row in rows],
+                      "widths": width_percentages(self.ATTENDANCE_COL_WIDTHS[includes_excuse])})
+
+    def add_signature_table(self, story, signatories):
+        story.append({"kind": "signatures", "signatories": [
+            (markup_html(label), image_data_uri(path), markup_html(name))
+            for label, path, name in signatories]})
+
+
+def render_html(data, standalone=True):
+    return MOMHtml(data=data).render(standalone=standalone)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        html = MOMHtml(sys.argv[1]).render()
+        output = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(os.path.basename(sys.argv[1]))[0] + ".html"
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(html)
+        print(output)
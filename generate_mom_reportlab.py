@@ -1,13 +1,232 @@
+import hashlib
 import os
-import json
 import sys
 import re
+import threading
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from html.parser import HTMLParser
+from io import BytesIO
+from reportlab import rl_config
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak, KeepTogether
+from reportlab.platypus import (SimpleDocTemplate, BaseDocTemplate, PageTemplate, Frame, Flowable, Paragraph,
+                                Spacer, Table, TableStyle, Image, PageBreak, KeepTogether)
+from reportlab.lib.utils import ImageReader
 from reportlab.lib.units import mm
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from attendance import Attendance
+from mom_io import load_mom_file, validate_mom
+from instrumentation import phase, profiled
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# PDF output profiles, chosen with MOMReportLab(profile=...) or MOM_PDF_PROFILE:
+#   image_dpi: downsample images to this resolution at their drawn size (never upsampled)
+#   image_format: re-encode images as "JPEG" (flattened on white) or "PNG" (Flate)
+#   page_compression: Flate-compress page content (ReportLab's default is already on)
+#   ascii85: ASCII85-encode streams, as ReportLab does by default (adds 25% to images)
+#   stamp_assets: stamp the letterhead on page 1 from a PDF form XObject drawn by the
+#       page template, and draw the signature block through a form, instead of laying
+#       both out as ordinary flowables (see MOMReportLab.build_doc)
+# "standard" leaves images as they are. With MOM_PDF_FONT set to a TrueType file
+# (MOM_PDF_FONT_BOLD, _ITALIC and _BOLDITALIC optional) that font replaces Helvetica in
+# every profile, for names with diacritics; only the glyphs used are embedded.
+PDF_PROFILES = {
+    "standard": {"image_dpi": None, "image_format": None, "jpeg_quality": None, "page_compression": None,
+                 "ascii85": True, "stamp_assets": False},
+    "compact": {"image_dpi": 150, "image_format": "JPEG", "jpeg_quality": 75, "page_compression": 1,
+                "ascii85": False, "stamp_assets": False},
+    # compact, for bulk and compendium runs
+    "batch": {"image_dpi": 150, "image_format": "JPEG", "jpeg_quality": 75, "page_compression": 1,
+              "ascii85": False, "stamp_assets": True},
+}
+DEFAULT_PDF_PROFILE = os.environ.get("MOM_PDF_PROFILE", "standard")
+
+# rl_config.useA85 is process-wide and read throughout a build, so every build holds
+# stream_encoding: builds with the same encoding run together, a build with the other
+# one waits until they finish (the render queues run builds on concurrent threads)
+_a85_condition = threading.Condition()
+_a85_builds = 0
+_default_a85 = rl_config.useA85
+
+@contextmanager
+def stream_encoding(ascii85):
+    """
+    Holds rl_config.useA85 for one build: the default (ASCII85) or, with ascii85 false,
+    binary streams.
+    """
+    global _a85_builds
+    use_a85 = _default_a85 if ascii85 else 0
+    with _a85_condition:
+        _a85_condition.wait_for(lambda: not _a85_builds or rl_config.useA85 == use_a85)
+        rl_config.useA85 = use_a85
+        _a85_builds += 1
+    try:
+        yield
+    finally:
+        with _a85_condition:
+            _a85_builds -= 1
+            if not _a85_builds:
+                rl_config.useA85 = _default_a85
+                _a85_condition.notify_all()
+
+def pdf_font_files():
+    regular = os.environ.get("MOM_PDF_FONT")
+    if not regular:
+        return None
+    return (regular, os.environ.get("MOM_PDF_FONT_BOLD"), os.environ.get("MOM_PDF_FONT_ITALIC"),
+            os.environ.get("MOM_PDF_FONT_BOLDITALIC"))
+
+@lru_cache(maxsize=None)
+def register_ttf_family(regular, bold=None, italic=None, bold_italic=None):
+    """
+    Registers a TrueType family (missing variants fall back to the regular or bold file)
+    so Paragraph <b>/<i> markup resolves within it. Returns a map from the Helvetica
+    font names to the registered ones.
+    """
+    base = "MOM-" + os.path.splitext(os.path.basename(regular))[0]
+    files = {"": regular, "-Bold": bold or regular, "-Oblique": italic or regular,
+             "-BoldOblique": bold_italic or bold or regular}
+    names = {}
+    for suffix, path in files.items():
+        pdfmetrics.registerFont(TTFont(base + suffix, path))
+        names["Helvetica" + suffix] = base + suffix
+    pdfmetrics.registerFontFamily(base, normal=base, bold=base + "-Bold", italic=base + "-Oblique",
+                                  boldItalic=base + "-BoldOblique")
+    return names
+
+@lru_cache(maxsize=32)
+def prepared_image(path, mtime, width_px, height_px, image_format, quality):
+    """
+    Returns the image at path downsampled to at most width_px x height_px (height from
+    the aspect ratio when None) and encoded as image_format. Cached per file version.
+    """
+    from PIL import Image as PILImage
+    with PILImage.open(path) as im:
+        im.load()
+    if height_px is None:
+        height_px = round(im.height * width_px / im.width)
+    size = (min(im.width, width_px), min(im.height, height_px))
+    if size != im.size:
+        im = im.resize(size, PILImage.LANCZOS)
+    out = BytesIO()
+    if image_format == "JPEG":
+        if im.mode in ("RGBA", "LA", "P"):
+            im = im.convert("RGBA")
+            flat = PILImage.new("RGB", im.size, "white")
+            flat.paste(im, mask=im.getchannel("A"))
+            im = flat
+        im.convert("RGB").save(out, "JPEG", quality=quality, optimize=True)
+    else:
+        im.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+# Signature images a MOM's own "Signatories" may name, within the app directory
+SIGNATURE_IMAGE_TYPES = (".png", ".jpg", ".jpeg")
+
+def signature_image(path):
+    """
+    Resolves a signature image named in MOM data against the app directory. Absolute
+    paths, ".." and other file types give "" (no image), so a MOM sent to the render
+    service cannot embed other files from the server.
+    """
+    path = str(path or "").replace("\\", "/")
+    parts = path.split("/")
+    # Rooted or drive-letter paths, and any step up
+    if path.startswith("/") or ":" in parts[0] or ".." in parts:
+        return ""
+    if not path.lower().endswith(SIGNATURE_IMAGE_TYPES):
+        return ""
+    return os.path.join(BASE_DIR, *parts)
+
+def signatory_tuples(entries, image_path=str):
+    """
+    [{"Label", "Nama", "Image"}, ...] -> [(label, image path, name), ...], with the
+    fields as strings and Image passed through image_path. None unless entries is a
+    non-empty list of dicts.
+    """
+    if not isinstance(entries, list) or not entries or not all(isinstance(e, dict) for e in entries):
+        return None
+    return [(str(e.get("Label") or ""), image_path(e.get("Image") or ""), str(e.get("Nama") or ""))
+            for e in entries]
+
+@lru_cache(maxsize=8)
+def configured_signatories(path, mtime):
+    """
+    Signatories from a JSON file: a list of {"Label", "Nama", "Image"} or an object
+    with that list under "Signatories". Cached per file version.
+    """
+    entries = load_mom_file(path, validate=False)
+    if isinstance(entries, dict):
+        entries = entries.get("Signatories", [])
+    return signatory_tuples(entries)
+
+class FormFlowable(Flowable):
+    """
+    Draws a flowable through a named PDF form XObject: the content is laid out once,
+    written to the file on first use and referenced wherever the same name is drawn
+    again in that document (e.g. every meeting of a compendium).
+    """
+    def __init__(self, name, content, avail_width):
+        super().__init__()
+        self.name = name
+        self.content = content
+        self.hAlign = getattr(content, "hAlign", "LEFT")
+        self.width, self.height = content.wrap(avail_width, A4[1])
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        canvas = self.canv
+        if not canvas.hasForm(self.name):
+            canvas.beginForm(self.name, 0, 0, self.width, self.height)
+            self.content.drawOn(canvas, 0, 0)
+            canvas.endForm()
+        canvas.doForm(self.name)
+
+# Most flowables a StreamingStory reads ahead of the layout
+LOOKAHEAD = 64
+
+class StreamingStory(list):
+    """
+    A story filled from an iterator of flowables as the layout consumes it; lay it out
+    on a StreamingDocTemplate. Only the front of the list is kept: at least two
+    flowables, and past a run of keepWithNext ones, which handle_keepWithNext groups
+    with the flowable after them.
+    """
+    def __init__(self, flowables):
+        super().__init__()
+        self.source = iter(flowables)
+        # Flowables taken from the source so far: the whole story once it is laid out
+        self.taken = 0
+        self.fill()
+
+    def fill(self):
+        while len(self) < LOOKAHEAD and (len(self) < 2 or self[-1].getKeepWithNext()):
+            flowable = next(self.source, None)
+            if flowable is None:
+                break
+            self.append(flowable)
+            self.taken += 1
+
+class StreamingDocTemplate(SimpleDocTemplate):
+    """
+    Tops up a StreamingStory around each flowable it lays out. BaseDocTemplate.build
+    stops when the story is empty, so it is refilled after the flowable as well as
+    before it. Its progress callbacks count the story list, which here only holds the
+    lookahead; streaming renderers report their own (see MOMReportLabStream).
+    """
+    def handle_flowable(self, flowables):
+        if isinstance(flowables, StreamingStory):
+            flowables.fill()
+        super().handle_flowable(flowables)
+        if isinstance(flowables, StreamingStory):
+            flowables.fill()
 
 def markdown_to_reportlab(text):
     if not isinstance(text, str):
@@ -17,27 +236,79 @@ def markdown_to_reportlab(text):
     text = text.replace('\n', '<br/>')
     return text
 
+class InlineMarkup(HTMLParser):
+    """
+    Splits ReportLab paragraph markup (<b>, <i>, <u>, <br/>, entities) into
+    (text, bold, italic, underline) runs. Other tags are dropped, their text kept.
+    """
+    FLAGS = {"b": 0, "strong": 0, "i": 1, "em": 1, "u": 2}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.depth = [0, 0, 0]
+        self.runs = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "br":
+            self.handle_data("\n")
+        elif tag in self.FLAGS:
+            self.depth[self.FLAGS[tag]] += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.FLAGS and self.depth[self.FLAGS[tag]]:
+            self.depth[self.FLAGS[tag]] -= 1
+
+    def handle_data(self, data):
+        flags = tuple(d > 0 for d in self.depth)
+        if self.runs and self.runs[-1][1:] == flags:
+            self.runs[-1] = (self.runs[-1][0] + data,) + flags
+        else:
+            self.runs.append((data,) + flags)
+
+def markup_runs(markup):
+    """
+    Returns the (text, bold, italic, underline) runs of a ReportLab paragraph string,
+    for the writers that do not take ReportLab markup (DOCX, HTML).
+    """
+    # Plain text (most table cells) skips the parser
+    if "<" not in markup and "&" not in markup:
+        return [(markup, False, False, False)]
+    parser = InlineMarkup()
+    parser.feed(markup)
+    parser.close()
+    return parser.runs
+
 class MOMReportLab:
-    def __init__(self, json_path, output_pdf=None):
+    def __init__(self, json_path=None, output_pdf=None, data=None, profile=None):
+        # data: an in-memory MOM dict, used instead of reading json_path.
+        # output_pdf may also be a file-like object (e.g. BytesIO).
+        # profile: a PDF_PROFILES name, MOM_PDF_PROFILE by default.
         self.json_path = json_path
-        with open(json_path, 'r') as f:
-            json_data = json.load(f)
-        
-        # Handle list-wrapped JSON
-        if isinstance(json_data, list) and len(json_data) > 0:
-            self.data = json_data[0]
-        else:
-            self.data = json_data
+        profile = profile or DEFAULT_PDF_PROFILE
+        if profile not in PDF_PROFILES:
+            raise ValueError(f"Unknown PDF profile {profile!r}; expected one of {', '.join(PDF_PROFILES)}.")
+        self.profile_name = profile
+        self.profile = PDF_PROFILES[profile]
+        # Handles list-wrapped JSON
+        self.data = validate_mom(data) if data is not None else load_mom_file(json_path)
         
         if not output_pdf:
-            base = os.path.splitext(os.path.basename(json_path))[0]
+            base = os.path.splitext(os.path.basename(json_path))[0] if json_path else "mom"
             self.output_pdf = f"{base}_reportlab.pdf"
         else:
             self.output_pdf = output_pdf
             
         self.styles = getSampleStyleSheet()
         self.setup_styles()
+        font_files = pdf_font_files()
+        self.fonts = register_ttf_family(*font_files) if font_files else {}
+        if self.fonts:
+            for style in self.styles.byName.values():
+                if getattr(style, "fontName", None) in self.fonts:
+                    style.fontName = self.fonts[style.fontName]
         self.paragraph_counter = 0
+        # (image, width, height) of the page 1 letterhead when stamp_assets is on
+        self.letterhead = None
 
     def setup_styles(self):
         self.styles.add(ParagraphStyle(
@@ -106,44 +377,226 @@ class MOMReportLab:
         
         return table_data
 
-    def create_pdf(self):
-        def add_page_number(canvas, doc):
-            canvas.saveState()
-            canvas.setFont('Helvetica', 10)
-            page_num = canvas.getPageNumber()
-            canvas.drawCentredString(A4[0]/2, 10*mm, f"{page_num}")
-            canvas.restoreState()
+    # Agenda sections in document order, mapped to the MOM keys each one reads
+    # (used by create_pdf and to slice the data for section previews)
+    SECTIONS = {
+        "ChairmanAddress": ("ChairmanAddress",),
+        "ApprovalOfPrevMinutes": ("ApprovalOfPrevMinutes", "Header"),
+        "MattersArising": ("MattersArising", "Agenda_3"),
+        "Financial": ("Reports",),
+        "Membership": ("Reports",),
+        "NewMatters": ("NewMatters", "Agenda_6"),
+        "Closing": ("Closing", "Penutup"),
+        "Annex": ("Annex",)
+    }
+
+    # Attendance table column widths, without and with the Sebab (excuse) column
+    ATTENDANCE_COL_WIDTHS = {
+        False: [80*mm, 30*mm, 50*mm],
+        True: [65*mm, 25*mm, 35*mm, 35*mm],
+    }
+
+    # Phase names for instrumentation, e.g. reportlab.story.Annex
+    PHASE_PREFIX = "reportlab"
+
+    # Made by make_doc; StreamingDocTemplate where the story is a StreamingStory
+    DOC_TEMPLATE = SimpleDocTemplate
+
+    # Default signature block: (label, signature image, name), left to right.
+    # Overridden per MOM by "Signatories" or per installation by MOM_SIGNATORIES.
+    SIGNATORIES = [
+        ("Disediakan Oleh:", "mej_tg_nazri.png", "Mej Tengku Ahmad Nazri bin Tengku Abdul Jalil (B)"),
+        ("Diluluskan Oleh:", "dsaa_sign.png", "Lt Jen Dato' Sri Abdul Aziz bin Ibrahim (B)"),
+    ]
+
+    # Output primitives. The build_* methods only add content through these, so a
+    # subclass can write another format (see generate_mom_docx.py) with the same
+    # section logic and paragraph numbering.
+
+    def add_paragraph(self, story, text, style='MOM_Normal'):
+        story.append(Paragraph(text, self.styles[style]))
+
+    def add_spacer(self, story, height):
+        story.append(Spacer(1, height))
+
+    def add_page_break(self, story):
+        story.append(PageBreak())
+
+    @contextmanager
+    def kept_together(self, story):
+        # Content added to the yielded story is kept on one page
+        flowables = []
+        yield flowables
+        story.append(KeepTogether(flowables))
 
-        doc = SimpleDocTemplate(
-            self.output_pdf,
+    def story_size(self, story):
+        return len(story)
+
+    def make_doc(self, output, **kwargs):
+        return self.DOC_TEMPLATE(
+            output,
             pagesize=A4,
             rightMargin=20*mm,
             leftMargin=20*mm,
             topMargin=20*mm,
-            bottomMargin=20*mm
+            bottomMargin=20*mm,
+            pageCompression=self.profile["page_compression"],
+            **kwargs
         )
-        
-        story = []
-        header = self.data.get("Header", {})
-        
-        # Logo
-        logo_path = 'logo.png'
-        if os.path.exists(logo_path):
-            img = Image(logo_path)
-            # Maintain aspect ratio and set to a reasonable width
-            orig_w, orig_h = img.imageWidth, img.imageHeight
-            aspect = orig_h / orig_w
-            
-            target_width = 160*mm 
-            img.drawWidth = target_width
-            img.drawHeight = target_width * aspect
+
+    def add_page_number(self, canvas, doc):
+        canvas.saveState()
+        canvas.setFont(self.fonts.get('Helvetica', 'Helvetica'), 10)
+        page_num = canvas.getPageNumber()
+        canvas.drawCentredString(A4[0]/2, 10*mm, f"{page_num}")
+        canvas.restoreState()
+
+    def create_pdf(self, progress_callback=None):
+        with profiled("reportlab.create_pdf"):
+            doc = self.make_doc(self.output_pdf)
+            if progress_callback:
+                # Called by doc.build with (type, value), e.g. ('SIZE_EST', n) then ('PROGRESS', i)
+                doc.setProgressCallBack(progress_callback)
             
+            story = self.make_story()
+
+            with phase("reportlab.build") as info, stream_encoding(self.profile["ascii85"]):
+                # The build empties the list, and a StreamingStory only ever holds its
+                # lookahead: it is counted by what it took once laid out
+                count = None if isinstance(story, StreamingStory) else len(story)
+                self.build_doc(doc, story)
+                info["flowables"] = story.taken if count is None else count
+                info["pages"] = doc.page
+            return self.output_pdf
+
+    def make_story(self):
+        # The whole document as a list of flowables, for doc.build
+        story = []
+        self.build_story(story)
+        return story
+
+    def build_doc(self, doc, story):
+        """
+        Lays out story on doc with page numbers. With a stamped letterhead (stamp_assets)
+        the first page template draws it above a frame shortened by its height, where
+        the logo flowable would otherwise be.
+        """
+        if not self.letterhead:
+            doc.build(story, onFirstPage=self.add_page_number, onLaterPages=self.add_page_number)
+            return
+        doc.addPageTemplates(list(self.page_templates(doc)))
+        # SimpleDocTemplate.build would replace the templates; it switches to 'Later'
+        # after each page as usual
+        BaseDocTemplate.build(doc, story)
+
+    def page_templates(self, doc):
+        # ('First', 'Later') page templates; 'First' stamps the letterhead when there is one
+        later = PageTemplate(id='Later', pagesize=doc.pagesize, onPage=self.add_page_number,
+                             frames=[Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')])
+        if not self.letterhead:
+            return PageTemplate(id='First', pagesize=doc.pagesize, onPage=self.add_page_number,
+                                frames=[Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height,
+                                              id='first')]), later
+        _, _, logo_height = self.letterhead
+        first = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height - logo_height - 5, id='first')
+        return PageTemplate(id='First', frames=[first], onPage=self.stamp_first_page, pagesize=doc.pagesize), later
+
+    def stamp_first_page(self, canvas, doc):
+        self.stamp_letterhead(canvas, doc)
+        self.add_page_number(canvas, doc)
+
+    def stamp_letterhead(self, canvas, doc):
+        # Where the centered logo flowable would sit, below the frame's top padding
+        image, width, height = self.letterhead
+        if not canvas.hasForm("MOMLetterhead"):
+            canvas.beginForm("MOMLetterhead", 0, 0, width, height)
+            canvas.drawImage(image, 0, 0, width, height, mask='auto')
+            canvas.endForm()
+        canvas.saveState()
+        canvas.translate((doc.pagesize[0] - width) / 2, doc.pagesize[1] - doc.topMargin - 6 - height)
+        canvas.doForm("MOMLetterhead")
+        canvas.restoreState()
+
+    def build_story(self, story):
+        """
+        Adds the whole document to story: front matter, the SECTIONS in order and the
+        signatures. Subclasses writing other formats reuse it through the add_* methods.
+        """
+        with phase(f"{self.PHASE_PREFIX}.story.front_matter"):
+            self.build_front_matter(story)
+        for section in self.SECTIONS:
+            if section == "Annex":
+                # Signatures close the minutes, ahead of the annexes
+                with phase(f"{self.PHASE_PREFIX}.story.signatures"):
+                    self.build_signatures(story)
+            with phase(f"{self.PHASE_PREFIX}.story.{section}") as info:
+                start = self.story_size(story)
+                self.build_section(story, section)
+                info["flowables"] = self.story_size(story) - start
+
+    @classmethod
+    def section_data(cls, data, section):
+        """
+        Returns the part of a MOM dict that the given section reads.
+        """
+        return {k: data[k] for k in cls.SECTIONS[section] if k in data}
+
+    def build_section(self, story, section):
+        getattr(self, f"build_{section}")(story)
+
+    def section_start_numbers(self):
+        """
+        The paragraph_counter value each of SECTIONS starts from. A cheap first pass:
+        the section builders run with primitives that discard their output.
+        """
+        numbering = SectionNumbering(data=self.data, profile=self.profile_name)
+        numbering.paragraph_counter = self.paragraph_counter
+        starts = {}
+        for section in self.SECTIONS:
+            starts[section] = numbering.paragraph_counter
+            numbering.build_section(None, section)
+        return starts
+
+    def get_header(self):
+        return self.data.get("Header", self.data) # Fallback to top level for legacy
+
+    def image_source(self, path, width, height=None):
+        # The file itself, or its downsampled/re-encoded bytes when the profile asks
+        if not (self.profile["image_dpi"] or self.profile["image_format"]):
+            return path
+        dpi = self.profile["image_dpi"] or 300
+        return BytesIO(prepared_image(
+            path, os.path.getmtime(path), round(width / 72 * dpi),
+            round(height / 72 * dpi) if height is not None else None,
+            self.profile["image_format"] or "PNG", self.profile["jpeg_quality"]))
+
+    def make_image(self, path, width, height=None):
+        """
+        Image flowable drawn at width x height (height keeps the aspect ratio when None),
+        downsampled and re-encoded as the output profile asks.
+        """
+        img = Image(self.image_source(path, width, height))
+        # Maintain aspect ratio unless both sides are given
+        aspect = img.imageHeight / img.imageWidth
+        img.drawWidth = width
+        img.drawHeight = height if height is not None else width * aspect
+        return img
+
+    def add_logo(self, story, logo_path):
+        if os.path.exists(logo_path) and self.profile["stamp_assets"]:
+            # Stamped by the first page template instead (see build_doc)
+            image = ImageReader(self.image_source(logo_path, 160*mm))
+            image_width, image_height = image.getSize()
+            self.letterhead = (image, 160*mm, 160*mm * image_height / image_width)
+        elif os.path.exists(logo_path):
+            # Set to a reasonable width
+            img = self.make_image(logo_path, 160*mm)
             img.hAlign = 'CENTER'
             story.append(img)
             story.append(Spacer(1, 5))
 
-        # Header Block
-        header = self.data.get("Header", self.data) # Fallback to top level for legacy
+    def header_lines(self):
+        header = self.get_header()
         jenis = str(header.get("Jenis", header.get("jenis", "exco"))).upper()
         title_type = "JAWATANKUASA EKSEKUTIF" if jenis == "EXCO" else "AGUNG TAHUNAN"
         siri = header.get("Siri", header.get("siri", "N/A"))
@@ -151,27 +604,33 @@ class MOMReportLab:
         masa = str(header.get("Masa", header.get("masa", "N/A"))).upper()
         tempat = str(header.get("Tempat", header.get("tempat", "N/A"))).upper()
         
-        header_text = f"MINIT MESYUARAT {title_type} SIRI {siri}<br/>PADA {tarikh} JAM {masa}<br/>DI {tempat}"
-        story.append(Paragraph(header_text, self.styles['MOM_HeaderBlock']))
-        story.append(Spacer(1, 15))
+        return [f"MINIT MESYUARAT {title_type} SIRI {siri}", f"PADA {tarikh} JAM {masa}", f"DI {tempat}"]
+
+    def build_front_matter(self, story):
+        self.add_logo(story, 'logo.png')
+
+        # Header Block
+        self.add_paragraph(story, "<br/>".join(self.header_lines()), 'MOM_HeaderBlock')
+        self.add_spacer(story, 15)
         
         # Attendance
         attn = self.data.get("Attendance", {})
         hadir_data = attn.get("Hadir", self.data.get("Hadir", []))
-        story.append(Paragraph("HADIR", self.styles['MOM_SectionHeader']))
-        story.append(self.create_attendance_table(hadir_data))
+        self.add_paragraph(story, "HADIR", 'MOM_SectionHeader')
+        self.add_attendance_table(story, hadir_data)
         
         tidak_hadir_data = attn.get("Tidak Hadir", self.data.get("Tidak_hadir", []))
         if tidak_hadir_data:
-            story.append(Spacer(1, 5))
-            story.append(Paragraph("TIDAK HADIR (DENGAN MAAF)", self.styles['MOM_SectionHeader']))
-            story.append(self.create_attendance_table(tidak_hadir_data, includes_excuse=True))
+            self.add_spacer(story, 5)
+            self.add_paragraph(story, "TIDAK HADIR (DENGAN MAAF)", 'MOM_SectionHeader')
+            self.add_attendance_table(story, tidak_hadir_data, includes_excuse=True)
 
-        story.append(Spacer(1, 10))
-        
-        # Main Content
-        # We handle both modern schema and legacy Agenda_X schema
-        
+        self.add_spacer(story, 10)
+
+    # Main Content
+    # We handle both modern schema and legacy Agenda_X schema
+
+    def build_ChairmanAddress(self, story):
         # 1. Chairman Address / Agenda 1
         agenda1_data = self.data.get("ChairmanAddress", {})
         if isinstance(agenda1_data, str):
@@ -182,17 +641,17 @@ class MOMReportLab:
             title = agenda1_data.get("Perkara", "UCAPAN PEMBUKAAN OLEH PRESIDEN")
             
         if chairman_address:
-            story.append(PageBreak()) # Force Agenda 1 to start on a new page (Page 2)
+            self.add_page_break(story) # Force Agenda 1 to start on a new page (Page 2)
             
-            # Use KeepTogether to ensure title and content stay on the same page
-            agenda1_flowables = []
-            agenda1_flowables.append(Paragraph(f"AGENDA 1: {title}", self.styles['MOM_SectionHeader']))
-            self.add_numbered_paragraphs(agenda1_flowables, chairman_address)
-            agenda1_flowables.append(Paragraph(f"{self.get_next_num()}. Keputusan. Makluman.", self.styles['MOM_Normal']))
-            
-            story.append(KeepTogether(agenda1_flowables))
+            # Keep title and content on the same page
+            with self.kept_together(story) as agenda1_flowables:
+                self.add_paragraph(agenda1_flowables, f"AGENDA 1: {title}", 'MOM_SectionHeader')
+                self.add_numbered_paragraphs(agenda1_flowables, chairman_address)
+                self.add_paragraph(agenda1_flowables, f"{self.get_next_num()}. Keputusan. Makluman.")
 
+    def build_ApprovalOfPrevMinutes(self, story):
         # 2. Approval of Minutes / Agenda 2
+        header = self.get_header()
         agenda2_data = self.data.get("ApprovalOfPrevMinutes", {})
         if isinstance(agenda2_data, str):
             approval = agenda2_data
@@ -202,16 +661,17 @@ class MOMReportLab:
             title = agenda2_data.get("Perkara", f"MENGESAHKAN MINIT MESYUARAT JAWATANKUASA SIRI {header.get('Siri', 'LALU')}")
             
         if approval:
-            story.append(Paragraph(f"AGENDA 2: {title}", self.styles['MOM_SectionHeader']))
+            self.add_paragraph(story, f"AGENDA 2: {title}", 'MOM_SectionHeader')
             self.add_numbered_paragraphs(story, approval)
-            story.append(Paragraph(f"{self.get_next_num()}. Keputusan. Makluman.", self.styles['MOM_Normal']))
+            self.add_paragraph(story, f"{self.get_next_num()}. Keputusan. Makluman.")
 
+    def build_MattersArising(self, story):
         # 3. Matters Arising / Agenda 3
         agenda3 = self.data.get("Agenda_3", {}) # Legacy support
         ma = self.data.get("MattersArising", [])
         
         title = agenda3.get("Perkara", "PERKARA-PERKARA BERBANGKIT")
-        story.append(Paragraph(f"AGENDA 3: {title}", self.styles['MOM_SectionHeader']))
+        self.add_paragraph(story, f"AGENDA 3: {title}", 'MOM_SectionHeader')
         
         if ma:
             for item in ma:
@@ -230,13 +690,13 @@ class MOMReportLab:
                 
                 # Display Keputusan as a numbered paragraph
                 if keputusan:
-                    story.append(Paragraph(f"{self.get_next_num()}. Keputusan: {keputusan}", self.styles['MOM_Normal']))
+                    self.add_paragraph(story, f"{self.get_next_num()}. Keputusan: {keputusan}")
         elif agenda3 and agenda3.get("Keterangan"):
             self.add_numbered_paragraphs(story, agenda3.get("Keterangan", ""))
         else:
-            story.append(Paragraph(f"{self.get_next_num()}. Tiada.", self.styles['MOM_Normal']))
-
+            self.add_paragraph(story, f"{self.get_next_num()}. Tiada.")
 
+    def build_Financial(self, story):
         # 4. Financial Report / Agenda 4
         rep_data = self.data.get("Reports", {})
         fin_data = rep_data.get("Financial", {})
@@ -248,11 +708,13 @@ class MOMReportLab:
             title = fin_data.get("Perkara", "LAPORAN KEWANGAN BERAKHIR")
             
         if financial:
-            story.append(Paragraph(f"AGENDA 4: {title}", self.styles['MOM_SectionHeader']))
+            self.add_paragraph(story, f"AGENDA 4: {title}", 'MOM_SectionHeader')
             self.add_numbered_paragraphs(story, financial)
-            story.append(Paragraph(f"{self.get_next_num()}. Keputusan. Makluman.", self.styles['MOM_Normal']))
-            
+            self.add_paragraph(story, f"{self.get_next_num()}. Keputusan. Makluman.")
+
+    def build_Membership(self, story):
         # 5. Membership Report / Agenda 5
+        rep_data = self.data.get("Reports", {})
         mem_data = rep_data.get("Membership", {})
         if isinstance(mem_data, str):
             membership = mem_data
@@ -262,10 +724,11 @@ class MOMReportLab:
             title = mem_data.get("Perkara", "LAPORAN KEAHLIAN BERAKHIR")
             
         if membership:
-            story.append(Paragraph(f"AGENDA 5: {title}", self.styles['MOM_SectionHeader']))
+            self.add_paragraph(story, f"AGENDA 5: {title}", 'MOM_SectionHeader')
             self.add_numbered_paragraphs(story, membership)
-            story.append(Paragraph(f"{self.get_next_num()}. Keputusan. Makluman.", self.styles['MOM_Normal']))
+            self.add_paragraph(story, f"{self.get_next_num()}. Keputusan. Makluman.")
 
+    def build_NewMatters(self, story):
         # 6. New Matters / Agenda 6
         agenda6 = self.data.get("Agenda_6", {}) # Legacy
         nm_raw = self.data.get("NewMatters", [])
@@ -286,7 +749,7 @@ class MOMReportLab:
 
         if nm or (agenda6 and agenda6.get("Keterangan")):
             title = agenda6.get("Perkara", "PERKARA-PERKARA BAHARU DARIPADA AHLI JAWATANKUASA")
-            story.append(Paragraph(f"AGENDA 6: {title}", self.styles['MOM_SectionHeader']))
+            self.add_paragraph(story, f"AGENDA 6: {title}", 'MOM_SectionHeader')
             if nm:
                 for item in nm:
                     num = self.get_next_num()
@@ -304,52 +767,78 @@ class MOMReportLab:
                     self.render_numbered_content(story, keterangan, first_prefix=prefix)
                     
                     if keputusan:
-                        story.append(Paragraph(f"{self.get_next_num()}. Keputusan: {markdown_to_reportlab(keputusan)}", self.styles['MOM_Normal']))
+                        self.add_paragraph(story, f"{self.get_next_num()}. Keputusan: {markdown_to_reportlab(keputusan)}")
             elif agenda6:
                 self.add_numbered_paragraphs(story, agenda6.get("Keterangan", ""))
 
+    def build_Closing(self, story):
         # Closing
         closing = self.data.get("Closing", self.data.get("Penutup", ""))
         if closing:
-            story.append(Paragraph("PENUTUP", self.styles['MOM_SectionHeader']))
+            self.add_paragraph(story, "PENUTUP", 'MOM_SectionHeader')
             self.add_numbered_paragraphs(story, closing)
 
+    def build_signatures(self, story):
         # Signature Sections
-        story.append(Spacer(1, 20))
-        
-        # Prepare signature images
-        prep_sig_path = 'mej_tg_nazri.png'
-        appr_sig_path = 'dsaa_sign.png'
-        
+        self.add_spacer(story, 20)
+        self.add_signature_table(story, self.signatories())
+
+    def signatories(self):
+        """
+        (label, image, name) per signature column: the MOM's "Signatories" list
+        ([{"Label", "Nama", "Image"}, ...], images within the app directory only, see
+        signature_image), else the MOM_SIGNATORIES JSON file, else SIGNATORIES. A list
+        of another shape falls through to the next source.
+        """
+        signatories = signatory_tuples(self.data.get("Signatories"), signature_image)
+        if signatories:
+            return signatories
+        path = os.environ.get("MOM_SIGNATORIES")
+        if path:
+            signatories = configured_signatories(path, os.path.getmtime(path))
+            if signatories:
+                return signatories
+        return self.SIGNATORIES
+
+    @staticmethod
+    def signature_col_width(count):
+        # 80mm columns, narrowed when more than two signatories share the frame width
+        return min(80*mm, (A4[0] - 40*mm - 12) / max(count, 1))
+
+    def add_signature_table(self, story, signatories):
         def get_sig_img(path):
             if os.path.exists(path):
-                img = Image(path, width=40*mm, height=20*mm)
+                img = self.make_image(path, 40*mm, 20*mm)
                 img.hAlign = 'LEFT'
                 return img
             return Spacer(1, 20*mm)
 
         sig_data = [
-            [Paragraph("<b>Disediakan Oleh:</b>", self.styles['MOM_Normal']), 
-             Paragraph("<b>Diluluskan Oleh:</b>", self.styles['MOM_Normal'])],
-            [get_sig_img(prep_sig_path), get_sig_img(appr_sig_path)],
-            [Paragraph("Mej Tengku Ahmad Nazri bin Tengku Abdul Jalil (B)", self.styles['MOM_Normal']),
-             Paragraph("Lt Jen Dato' Sri Abdul Aziz bin Ibrahim (B)", self.styles['MOM_Normal'])]
+            [Paragraph(f"<b>{label}</b>", self.styles['MOM_Normal']) for label, _, _ in signatories],
+            [get_sig_img(path) for _, path, _ in signatories],
+            [Paragraph(name, self.styles['MOM_Normal']) for _, _, name in signatories]
         ]
         
-        sig_table = Table(sig_data, colWidths=[80*mm, 80*mm])
+        sig_table = Table(sig_data, colWidths=[self.signature_col_width(len(signatories))] * len(signatories))
         sig_table.setStyle(TableStyle([
             ('VALIGN', (0, 0), (-1, -1), 'TOP'),
             ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
             ('TOPPADDING', (0, 0), (-1, -1), 0),
             ('LEFTPADDING', (0, 0), (-1, -1), 0),
         ]))
+        if self.profile["stamp_assets"]:
+            # One form per distinct block, shared by every document in the file
+            key = hashlib.md5(repr(signatories).encode("utf-8")).hexdigest()[:12]
+            story.append(FormFlowable(f"MOMSignatures{key}", sig_table, A4[0] - 40*mm - 12))
+            return
         story.append(KeepTogether(sig_table))
 
+    def build_Annex(self, story):
         # Annex (Kembaran)
         annex_content = self.data.get("Annex", "")
         if annex_content:
-            story.append(PageBreak())
-            story.append(Paragraph("KEMBARAN-KEMBARAN:", self.styles['MOM_AnnexHeader']))
+            self.add_page_break(story)
+            self.add_paragraph(story, "KEMBARAN-KEMBARAN:", 'MOM_AnnexHeader')
             
             lines = annex_content.split('\n')
             current_table = []
@@ -363,14 +852,11 @@ class MOMReportLab:
                         current_table = []
                     
                     if line.strip():
-                        story.append(Paragraph(markdown_to_reportlab(line), self.styles['MOM_Normal']))
+                        self.add_paragraph(story, markdown_to_reportlab(line))
             
             if current_table:
                 self.flush_annex_table(story, current_table)
 
-        doc.build(story, onFirstPage=add_page_number, onLaterPages=add_page_number)
-        return self.output_pdf
-
     def add_numbered_paragraphs(self, story, content):
         self.render_numbered_content(story, content)
 
@@ -418,12 +904,19 @@ class MOMReportLab:
                     self.flush_annex_table(story, current_table)
                     current_table = []
                 if line.strip():
-                    story.append(Paragraph(markdown_to_reportlab(line), self.styles[style_name]))
+                    self.add_paragraph(story, markdown_to_reportlab(line), style_name)
         if current_table:
             self.flush_annex_table(story, current_table)
 
     def flush_annex_table(self, story, current_table):
-        # We need raw text to calculate lengths before wrapping in Paragraphs
+        with phase("reportlab.table", rows=len(current_table)):
+            self._flush_annex_table(story, current_table)
+
+    @staticmethod
+    def table_rows(current_table):
+        """
+        Returns the cell texts of a block of markdown table lines, without separator rows.
+        """
         raw_table_data = []
         lines = [line.strip() for line in '\n'.join(current_table).split('\n') if line.strip()]
         for line in lines:
@@ -432,12 +925,14 @@ class MOMReportLab:
                     continue
                 cells = [c.strip() for c in line.split('|')[1:-1]]
                 raw_table_data.append(cells)
-        
-        if not raw_table_data:
-            return
+        return raw_table_data
 
+    @staticmethod
+    def table_col_widths(raw_table_data, available_width=A4[0] - 40*mm):
+        """
+        Column widths (in points) proportional to the longest text in each column.
+        """
         num_cols = len(raw_table_data[0])
-        available_width = A4[0] - 40*mm
         
         # Calculate max length in each column
         max_lengths = [0] * num_cols
@@ -461,58 +956,77 @@ class MOMReportLab:
         if current_total > available_width:
             ratio = available_width / current_total
             col_widths = [w * ratio for w in col_widths]
+        return col_widths
+
+    def _flush_annex_table(self, story, current_table):
+        # We need raw text to calculate lengths before wrapping in Paragraphs
+        raw_table_data = self.table_rows(current_table)
+        if not raw_table_data:
+            return
+        col_widths = self.table_col_widths(raw_table_data)
+
+        story.append(self.markdown_table(self.markdown_table_cells(raw_table_data), col_widths))
 
+    def markdown_table_cells(self, raw_rows):
         # Convert raw data to Paragraph objects for the table
-        table_data = []
-        for row in raw_table_data:
-            table_data.append([Paragraph(markdown_to_reportlab(c), self.styles['MOM_TableText']) for c in row])
+        return [[Paragraph(markdown_to_reportlab(c), self.styles['MOM_TableText']) for c in row] for row in raw_rows]
 
+    @staticmethod
+    def markdown_table(table_data, col_widths, header_rule=True):
+        # header_rule: rule under the first row (off for the continuation chunks of stream mode)
         t = Table(table_data, colWidths=col_widths)
-        t.setStyle(TableStyle([
+        commands = [
             ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
             ('VALIGN', (0, 0), (-1, -1), 'TOP'),
             ('FONTSIZE', (0, 0), (-1, -1), 9),
             ('TOPPADDING', (0, 0), (-1, -1), 2),
             ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ('LINEBELOW', (0, 0), (-1, 0), 0.5, colors.black),
-        ]))
-        story.append(t)
+        ]
+        if header_rule:
+            commands.append(('LINEBELOW', (0, 0), (-1, 0), 0.5, colors.black))
+        t.setStyle(TableStyle(commands))
+        return t
 
-    def create_attendance_table(self, attendance_list, includes_excuse=False):
-        if not attendance_list:
-            return Paragraph("Tiada rekod.", self.styles['MOM_Normal'])
-        
-        # Handle legacy structure: {"Nama": ["Name 1", "Name 2"]}
+    def add_attendance_table(self, story, attendance_list, includes_excuse=False):
+        story.append(self.create_attendance_table(attendance_list, includes_excuse))
+
+    @staticmethod
+    def attendance_rows(attendance_list, includes_excuse=False):
+        """
+        Returns (headers, rows of cell texts) for an attendance list in any of its
+        shapes: dicts, plain names or the legacy {"Nama": [...]}.
+        """
+        # Legacy structure {"Nama": ["Name 1", "Name 2"]}: names only
         if isinstance(attendance_list, dict) and "Nama" in attendance_list:
-            names = attendance_list["Nama"]
-            # Convert to list of dicts
-            attendance_list = [{"nama": n} for n in names]
-        
-        # Handle simple list of strings (if not legacy dict structure)
-        if isinstance(attendance_list, list) and len(attendance_list) > 0 and isinstance(attendance_list[0], str):
-            attendance_list = [{"nama": n} for n in attendance_list]
+            attendance = Attendance(nama=attendance_list["Nama"])
+        else:
+            attendance = Attendance.parse(attendance_list)
 
         # Table headers matching example: Nama, Singkatan, Jawatan
         headers = ['Nama', 'Singkatan', 'Jawatan']
-        col_widths = [80*mm, 30*mm, 50*mm]
-        
+        columns = [attendance.nama, attendance.singkatan, attendance.jawatan]
         if includes_excuse:
             headers = ['Nama', 'Singkatan', 'Jawatan', 'Sebab']
-            col_widths = [65*mm, 25*mm, 35*mm, 35*mm]
+            columns.append(attendance.sebab)
+        rows = [list(row) for row in zip(*columns)]
+        return headers, rows
+
+    def create_attendance_table(self, attendance_list, includes_excuse=False):
+        if not attendance_list:
+            return Paragraph("Tiada rekod.", self.styles['MOM_Normal'])
+
+        headers, rows = self.attendance_rows(attendance_list, includes_excuse)
+        col_widths = self.ATTENDANCE_COL_WIDTHS[includes_excuse]
             
         table_data = [[Paragraph(f"<b>{h}</b>", self.styles['MOM_TableText']) for h in headers]]
-        for person in attendance_list:
-            if isinstance(person, str):
-                person = {"nama": person}
-            row = [
-                Paragraph(person.get("nama", ""), self.styles['MOM_TableText']),
-                Paragraph(person.get("singkatan", ""), self.styles['MOM_TableText']),
-                Paragraph(person.get("jawatan", ""), self.styles['MOM_TableText'])
-            ]
-            if includes_excuse:
-                row.append(Paragraph(person.get("sebab", ""), self.styles['MOM_TableText']))
-            table_data.append(row)
-            
+        table_data.extend(self.attendance_cells(rows))
+        return self.attendance_table(table_data, col_widths)
+
+    def attendance_cells(self, rows):
+        return [[Paragraph(cell, self.styles['MOM_TableText']) for cell in row] for row in rows]
+
+    @staticmethod
+    def attendance_table(table_data, col_widths):
         t = Table(table_data, colWidths=col_widths)
         t.setStyle(TableStyle([
             ('VALIGN', (0, 0), (-1, -1), 'TOP'),
@@ -523,7 +1037,125 @@ class MOMReportLab:
         ]))
         return t
 
+class SectionNumbering(MOMReportLab):
+    """
+    Runs the section builders for their paragraph numbering only: every output
+    primitive discards its content, so no markup is converted and no flowable is made.
+    """
+    def add_paragraph(self, story, text, style='MOM_Normal'):
+        pass
+
+    def add_spacer(self, story, height):
+        pass
+
+    def add_page_break(self, story):
+        pass
+
+    @contextmanager
+    def kept_together(self, story):
+        yield story
+
+    def add_content_with_tables(self, story, text, style_name='MOM_Normal'):
+        pass
+
+    def add_logo(self, story, logo_path):
+        pass
+
+    def flush_annex_table(self, story, current_table):
+        pass
+
+    def add_attendance_table(self, story, attendance_list, includes_excuse=False):
+        pass
+
+    def add_signature_table(self, story, signatories):
+        pass
+
+# Rows per table in stream mode: long tables are laid out as consecutive chunks
+TABLE_CHUNK_ROWS = 25
+
+class MOMReportLabStream(MOMReportLab):
+    """
+    Stream mode for very large minutes. build_story records cheap recipes (markup
+    strings, table rows) instead of flowables, and iter_story makes them into
+    flowables only as doc.build takes them through a StreamingStory. Peak memory is
+    then the MOM data plus a few flowables, not the whole story; long tables come out
+    as chunks of TABLE_CHUNK_ROWS rows that lay out like the single table.
+    Progress is reported per recipe, as ('SIZE_EST', recipes) then ('PROGRESS', i).
+    """
+    DOC_TEMPLATE = StreamingDocTemplate
+    progress_callback = None
+
+    def create_pdf(self, progress_callback=None):
+        # doc.build would count the lookahead only (see StreamingDocTemplate)
+        self.progress_callback = progress_callback
+        return super().create_pdf()
+
+    def make_story(self):
+        return StreamingStory(self.iter_story())
+
+    def iter_story(self):
+        story = []
+        self.build_story(story)
+        total = len(story)
+        if self.progress_callback:
+            self.progress_callback('SIZE_EST', total)
+        # Popped so each recipe is released once its flowables are made
+        story.reverse()
+        while story:
+            yield from self.materialize([story.pop()])
+            if self.progress_callback:
+                self.progress_callback('PROGRESS', total - len(story))
+
+    @staticmethod
+    def materialize(items):
+        # Recipes are functions yielding flowables; logo, spacers and signatures stay flowables
+        for item in items:
+            if isinstance(item, Flowable):
+                yield item
+            else:
+                yield from item()
+
+    # Output primitives (see MOMReportLab)
+
+    def add_paragraph(self, story, text, style='MOM_Normal'):
+        story.append(partial(self.paragraph_flowables, text, style))
+
+    def paragraph_flowables(self, text, style):
+        yield Paragraph(text, self.styles[style])
+
+    @contextmanager
+    def kept_together(self, story):
+        recipes = []
+        yield recipes
+        story.append(partial(self.kept_flowables, recipes))
+
+    def kept_flowables(self, recipes):
+        yield KeepTogether(list(self.materialize(recipes)))
+
+    def flush_annex_table(self, story, current_table):
+        raw_table_data = self.table_rows(current_table)
+        if raw_table_data:
+            story.append(partial(self.markdown_table_chunks, raw_table_data, self.table_col_widths(raw_table_data)))
+
+    def markdown_table_chunks(self, raw_rows, col_widths):
+        for start in range(0, len(raw_rows), TABLE_CHUNK_ROWS):
+            cells = self.markdown_table_cells(raw_rows[start:start + TABLE_CHUNK_ROWS])
+            yield self.markdown_table(cells, col_widths, header_rule=not start)
+
+    def add_attendance_table(self, story, attendance_list, includes_excuse=False):
+        if not attendance_list:
+            self.add_paragraph(story, "Tiada rekod.")
+            return
+        headers, rows = self.attendance_rows(attendance_list, includes_excuse)
+        story.append(partial(self.attendance_table_chunks, headers, rows, self.ATTENDANCE_COL_WIDTHS[includes_excuse]))
+
+    def attendance_table_chunks(self, headers, rows, col_widths):
+        header = [[Paragraph(f"<b>{h}</b>", self.styles['MOM_TableText']) for h in headers]]
+        for start in range(0, max(len(rows), 1), TABLE_CHUNK_ROWS):
+            cells = self.attendance_cells(rows[start:start + TABLE_CHUNK_ROWS])
+            yield self.attendance_table(header + cells if not start else cells, col_widths)
+
 if __name__ == "__main__":
     if len(sys.argv) > 1:
-        mom = MOMReportLab(sys.argv[1])
+        mom = MOMReportLab(sys.argv[1], profile=sys.argv[2] if len(sys.argv) > 2 else None)
         mom.create_pdf()
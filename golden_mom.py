@@ -0,0 +1,191 @@
+"""
+Golden-output regression check for generate_mom_reportlab.py.
+
+Renders a fixed corpus and compares each PDF against goldens/<case>.json:
+page count, extracted text per page and the paragraph numbering of each section.
+Byte-identical PDFs (ReportLab runs in invariant mode here) pass without extraction.
+With --pixels, pages whose text changed are also rasterized and diffed against the
+golden PDF (needs pypdfium2 and a golden saved with --pixels).
+
+Usage:
+    python golden_mom.py check            # after every optimisation; exits 1 on differences
+    python golden_mom.py save             # accept the current output as the new goldens
+    python golden_mom.py check medium --pixels
+"""
+import argparse
+import difflib
+import hashlib
+import io
+import os
+import sys
+import time
+
+from reportlab import rl_config
+
+from mom_io import load_mom_file, loads_mom, dumps_mom, atomic_write_bytes
+from generate_mom_reportlab import MOMReportLab
+from bench_mom import make_synthetic_mom, CORPORA
+
+try:
+    import pypdfium2 as pdfium
+    from PIL import ImageChops
+except ImportError:
+    pdfium = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(BASE_DIR, "goldens")
+FIXTURE_DIR = os.path.join(GOLDEN_DIR, "fixtures")
+
+# Synthetic cases come from bench_mom with a fixed seed; changing its generator means re-saving
+CASES = {
+    "current": lambda: load_mom_file(os.path.join(FIXTURE_DIR, "current.json")),
+    "legacy": lambda: load_mom_file(os.path.join(FIXTURE_DIR, "legacy.json")),
+    "small": lambda: make_synthetic_mom(*CORPORA["small"], seed=0),
+    "medium": lambda: make_synthetic_mom(*CORPORA["medium"], seed=0),
+}
+
+
+def render_case(data):
+    """
+    Renders a MOM dict and returns (pdf bytes, numbering), where numbering maps each
+    section to the [first, last] paragraph number it used.
+    """
+    renderer = MOMReportLab(output_pdf=io.BytesIO(), data=data)
+    numbering = {}
+    build_section = renderer.build_section
+
+    def recording_build_section(story, section):
+        start = renderer.paragraph_counter
+        build_section(story, section)
+        numbering[section] = [start + 1, renderer.paragraph_counter]
+
+    renderer.build_section = recording_build_section
+    renderer.create_pdf()
+    return renderer.output_pdf.getvalue(), numbering
+
+
+def extract_pages(pdf_bytes):
+    import pypdf
+    return [page.extract_text() for page in pypdf.PdfReader(io.BytesIO(pdf_bytes)).pages]
+
+
+def golden_paths(case):
+    return os.path.join(GOLDEN_DIR, f"{case}.json"), os.path.join(GOLDEN_DIR, f"{case}.pdf")
+
+
+def save_case(case, pixels=False):
+    pdf_bytes, numbering = render_case(CASES[case]())
+    pages = extract_pages(pdf_bytes)
+    json_path, pdf_path = golden_paths(case)
+    golden = {
+        "sha256": hashlib.sha256(pdf_bytes).hexdigest(),
+        "pages": len(pages),
+        "numbering": numbering,
+        "page_text": pages,
+    }
+    atomic_write_bytes(json_path, dumps_mom(golden))
+    if pixels:
+        atomic_write_bytes(pdf_path, pdf_bytes)
+    return golden
+
+
+def pixel_diff(golden_pdf, new_pdf, page_indexes, scale=1.0):
+    """
+    Returns {page index: fraction of differing pixels} for the given pages.
+    """
+    old_doc, new_doc = pdfium.PdfDocument(golden_pdf), pdfium.PdfDocument(new_pdf)
+    result = {}
+    for i in page_indexes:
+        if i >= len(old_doc) or i >= len(new_doc):
+            result[i] = 1.0
+            continue
+        old_img = old_doc[i].render(scale=scale).to_pil().convert("L")
+        new_img = new_doc[i].render(scale=scale).to_pil().convert("L")
+        if old_img.size != new_img.size:
+            result[i] = 1.0
+            continue
+        diff = ImageChops.difference(old_img, new_img).point(lambda v: 255 if v > 16 else 0)
+        result[i] = round(diff.histogram()[255] / (diff.width * diff.height), 5)
+    return result
+
+
+def check_case(case, pixels=False):
+    """
+    Compares the current rendering of a case with its golden. Returns a list of
+    human-readable differences (empty when the output is unchanged).
+    """
+    json_path, pdf_path = golden_paths(case)
+    if not os.path.exists(json_path):
+        return [f"no golden (run: python golden_mom.py save {case})"]
+    with open(json_path, "rb") as f:
+        golden = loads_mom(f.read())
+
+    pdf_bytes, numbering = render_case(CASES[case]())
+    if hashlib.sha256(pdf_bytes).hexdigest() == golden["sha256"]:
+        return []
+
+    problems = []
+    if numbering != golden["numbering"]:
+        for section in dict.fromkeys(list(golden["numbering"]) + list(numbering)):
+            old, new = golden["numbering"].get(section), numbering.get(section)
+            if old != new:
+                problems.append(f"numbering {section}: {old} -> {new}")
+
+    pages = extract_pages(pdf_bytes)
+    if len(pages) != golden["pages"]:
+        problems.append(f"page count: {golden['pages']} -> {len(pages)}")
+
+    changed = []
+    for i in range(max(len(pages), len(golden["page_text"]))):
+        old = golden["page_text"][i] if i < len(golden["page_text"]) else ""
+        new = pages[i] if i < len(pages) else ""
+        if old != new:
+            changed.append(i)
+            diff = list(difflib.unified_diff(old.splitlines(), new.splitlines(), lineterm="", n=0))[2:8]
+            problems.append(f"page {i + 1} text changed:\n      " + "\n      ".join(diff))
+
+    if pixels and changed:
+        if pdfium is None:
+            problems.append("pixel diff skipped: pypdfium2 not installed")
+        elif not os.path.exists(pdf_path):
+            problems.append(f"pixel diff skipped: no golden PDF (run: python golden_mom.py save {case} --pixels)")
+        else:
+            with open(pdf_path, "rb") as f:
+                for i, ratio in pixel_diff(f.read(), pdf_bytes, changed).items():
+                    problems.append(f"page {i + 1} pixels differ: {ratio:.2%}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare ReportLab MOM output against stored goldens.")
+    parser.add_argument("command", choices=["check", "save"])
+    parser.add_argument("cases", nargs="*", help=f"cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument("--pixels", action="store_true",
+                        help="check: pixel-diff pages whose text changed; save: also store the golden PDF")
+    args = parser.parse_args(argv)
+
+    # Fixed timestamps and document IDs so unchanged output is byte-identical;
+    # the working directory matters for the logo and signature images
+    rl_config.invariant = 1
+    os.chdir(BASE_DIR)
+
+    failed = 0
+    for case in args.cases or CASES:
+        if case not in CASES:
+            parser.error(f"unknown case {case!r}")
+        start = time.perf_counter()
+        if args.command == "save":
+            golden = save_case(case, pixels=args.pixels)
+            print(f"{case}: saved {golden['pages']} page(s) ({time.perf_counter() - start:.2f}s)")
+            continue
+        problems = check_case(case, pixels=args.pixels)
+        status = "OK" if not problems else "DIFF"
+        print(f"{case}: {status} ({time.perf_counter() - start:.2f}s)")
+        for problem in problems:
+            print(f"    {problem}")
+        failed += bool(problems)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
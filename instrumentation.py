@@ -0,0 +1,164 @@
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+# Opt-in: MOM_PROFILE=1 records phase timings as JSON log lines (to MOM_PROFILE_LOG or stderr);
+# MOM_PROFILE_DUMP=<dir> additionally writes a pyinstrument/cProfile dump per profiled run.
+_enabled = os.environ.get("MOM_PROFILE", "").lower() in ("1", "true", "yes")
+_dump_dir = os.environ.get("MOM_PROFILE_DUMP")
+_recent = deque(maxlen=500)
+_lock = threading.Lock()
+
+logger = logging.getLogger("mom.profile")
+
+
+def _setup_logger():
+    if logger.handlers:
+        return
+    log_path = os.environ.get("MOM_PROFILE_LOG")
+    handler = logging.FileHandler(log_path) if log_path else logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def enable(flag=True, dump_dir=None):
+    global _enabled, _dump_dir
+    _enabled = flag
+    if dump_dir is not None:
+        _dump_dir = dump_dir
+    if flag:
+        _setup_logger()
+
+
+def is_enabled():
+    return _enabled
+
+
+def record(phase_name, seconds, **fields):
+    entry = {
+        "ts": round(time.time(), 3),
+        "phase": phase_name,
+        "ms": round(seconds * 1000, 2),
+        "thread": threading.current_thread().name,
+        **fields
+    }
+    with _lock:
+        _recent.append(entry)
+    logger.info(json.dumps(entry, ensure_ascii=False, default=str))
+    return entry
+
+
+@contextmanager
+def phase(phase_name, **fields):
+    """
+    Times the enclosed block as one phase. Costs a single flag check when profiling is off.
+    Extra fields may be added inside the block through the yielded dict.
+    """
+    if not _enabled:
+        yield fields
+        return
+    start = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        record(phase_name, time.perf_counter() - start, **fields)
+
+
+@contextmanager
+def profiled(label):
+    """
+    Times the block as phase `label` and, with a dump directory configured, writes a
+    pyinstrument HTML report (or a cProfile .prof file) for it.
+    """
+    if not _enabled:
+        yield
+        return
+    if not _dump_dir:
+        with phase(label):
+            yield
+        return
+
+    os.makedirs(_dump_dir, exist_ok=True)
+    stem = os.path.join(_dump_dir, f"{label}-{time.strftime('%Y%m%d-%H%M%S')}-{threading.get_ident()}")
+    if pyinstrument is not None:
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+        try:
+            with phase(label, dump=f"{stem}.html"):
+                yield
+        finally:
+            profiler.stop()
+            with open(f"{stem}.html", "w") as f:
+                f.write(profiler.output_html())
+    else:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            with phase(label, dump=f"{stem}.prof"):
+                yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(f"{stem}.prof")
+
+
+def run_with_phases(cmd, markers, prefix, **kwargs):
+    """
+    subprocess.run replacement that timestamps the tool's progress output.
+    markers is a list of (regex, phase name); a matching output line ends the current
+    phase and starts the named one. Returns a CompletedProcess like subprocess.run.
+    """
+    patterns = [(re.compile(p), name) for p, name in markers]
+    current, started = f"{prefix}.startup", time.perf_counter()
+    lines = []
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, **kwargs)
+    for line in proc.stdout:
+        lines.append(line)
+        for pattern, name in patterns:
+            if pattern.search(line):
+                now = time.perf_counter()
+                record(current, now - started)
+                current, started = f"{prefix}.{name}", now
+                break
+    proc.wait()
+    record(current, time.perf_counter() - started, returncode=proc.returncode)
+    # Output is merged, so it is reported as stdout with an empty stderr
+    return subprocess.CompletedProcess(cmd, proc.returncode, "".join(lines), "")
+
+
+def recent_timings():
+    with _lock:
+        return list(_recent)
+
+
+def summarize(entries=None):
+    """
+    Aggregates timings per phase: count, total, mean and last duration in ms.
+    """
+    summary = {}
+    for entry in entries if entries is not None else recent_timings():
+        stats = summary.setdefault(entry["phase"], {"phase": entry["phase"], "count": 0, "total_ms": 0.0})
+        stats["count"] += 1
+        stats["total_ms"] = round(stats["total_ms"] + entry["ms"], 2)
+        stats["last_ms"] = entry["ms"]
+    for stats in summary.values():
+        stats["mean_ms"] = round(stats["total_ms"] / stats["count"], 2)
+    return list(summary.values())
+
+
+if _enabled:
+    _setup_logger()
@@ -1,179 +1,209 @@
-import streamlit as st
-from groq import Groq
+import asyncio
+import os
+import sys
+import threading
+from instrumentation import phase
 
-def generate_chairman_note(points):
-    """
-    Generates a professional chairman's welcome note paragraph from a list of points.
-    """
-    if not points or all(not p.strip() for p in points):
-        return ""
+# groq (and streamlit) are imported on first use so the CLIs and the app's cold start
+# do not pay for them
 
-    try:
-        # Retrieve API key from Streamlit secrets or environment variables
-        import os
-        api_key = None
-        try:
-            api_key = st.secrets.get("GROQ_API_KEY")
-        except FileNotFoundError:
-            pass
-        
-        if not api_key:
-            api_key = os.environ.get("GROQ_API_KEY")
-            
-        if not api_key:
-            return "Error: GROQ_API_KEY not found. Please set it in .streamlit/secrets.toml or as an environment variable."
+LLM_MODEL = "llama-3.3-70b-versatile"
+LLM_TIMEOUT = float(os.environ.get("MOM_LLM_TIMEOUT", "60"))
+# Requests in flight at once, across every session, thread and event loop in the process
+LLM_CONCURRENCY = int(os.environ.get("MOM_LLM_CONCURRENCY", "4"))
 
-        client = Groq(api_key=api_key)
-        
-        # Filter out empty points
-        valid_points = [p.strip() for p in points if p.strip()]
-        points_str = "\n".join([f"- {p}" for p in valid_points])
+SYSTEM_PROMPT = "You are a professional secretary crafting meeting minutes."
 
-        prompt = f"""
+CHAIRMAN_NOTE_PROMPT = """
 You are an expert secretary drafting minutes of a meeting. 
 Based on the following points, generate a professional, welcoming, and concise "Chairman's Welcome Note" paragraph in Malay (Bahasa Melayu), as per the standard format for formal minutes of meeting in Malaysia.
 
 Points:
-{points_str}
+{points}
 
 The output should be a single paragraph. Do not include any other text or formatting.
 """
 
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a professional secretary crafting meeting minutes."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=500
-        )
+CLOSING_REMARK_PROMPT = """
+You are an expert secretary drafting minutes of a meeting. 
+Based on the following points, generate a professional, polite, and concise "Closing Remark" paragraph in Malay (Bahasa Melayu), as per the standard format for formal minutes of meeting in Malaysia.
+
+Points:
+{points}
 
-        return completion.choices[0].message.content.strip()
+The output should be a single paragraph. Do not include any other text or formatting.
+"""
 
-    except Exception as e:
-        return f"Error during generation: {str(e)}"
+FINANCIAL_SUMMARY_PROMPT = """
+You are an expert secretary drafting minutes of a meeting.
+Please analyze the following text extracted from a quarterly financial statement PDF.
+Summarize the key financial highlights into a single, professional paragraph in Malay (Bahasa Melayu).
+Focus on:
+1. Total Income (Pendapatan)
+2. Total Expenditure (Perbelanjaan)
+3. Current Balance (Baki Semasa)
+4. Any significant anomalies or big items mentioned.
 
-def generate_closing_remark(points):
+Do not use bullet points. Write it as a narrative paragraph suitable for "Agenda 4: Laporan Kewangan".
+
+Extracted Text:
+{text}
+"""
+
+NEW_MATTER_PROMPT = """
+You are an expert secretary drafting minutes of a meeting. 
+Based on the following points, generate a professional, detailed, and concise paragraph for a new agenda item in Malay (Bahasa Melayu), as per the standard format for formal minutes of meeting in Malaysia.
+
+Points:
+{points}
+
+The output should be a single paragraph describing the discussion or decision. Do not include any other text or formatting.
+"""
+
+def get_api_key():
     """
-    Generates a professional closing remark paragraph from a list of points.
+    Returns GROQ_API_KEY from Streamlit secrets when running inside the app, else from the environment.
     """
-    if not points or all(not p.strip() for p in points):
-        return ""
-
-    try:
-        # Retrieve API key from Streamlit secrets or environment variables
-        import os
-        api_key = None
+    api_key = None
+    st = sys.modules.get("streamlit")
+    if st is not None:
         try:
             api_key = st.secrets.get("GROQ_API_KEY")
         except FileNotFoundError:
             pass
-        
-        if not api_key:
-            api_key = os.environ.get("GROQ_API_KEY")
-            
+    return api_key or os.environ.get("GROQ_API_KEY")
+
+def async_groq_client(api_key):
+    from groq import AsyncGroq
+    return AsyncGroq(api_key=api_key)
+
+def format_points(points):
+    # Filter out empty points
+    return "\n".join([f"- {p.strip()}" for p in points if p.strip()])
+
+def extract_pdf_text(pdf_file):
+    import pypdf
+    with phase("llm.pdf_extract") as info:
+        reader = pypdf.PdfReader(pdf_file)
+        text = ""
+        for page in reader.pages:
+            text += page.extract_text() + "\n"
+        info["pages"] = len(reader.pages)
+    return text
+
+# All LLM requests run on one background event loop, so they share a connection pool
+# and the LLM_CONCURRENCY limit whichever thread or event loop they come from
+# (Streamlit sessions, the render service, batch tools)
+_loop = None
+_loop_lock = threading.Lock()
+_semaphore = None
+_clients = {}
+
+def _llm_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="mom-llm", daemon=True).start()
+    return _loop
+
+async def _chat(task, prompt, temperature, max_tokens, api_key):
+    # Runs on the shared loop, so the semaphore and clients are only touched from its thread
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+    if api_key not in _clients:
+        _clients[api_key] = async_groq_client(api_key)
+    async with _semaphore:
+        with phase(f"llm.{task}", model=LLM_MODEL):
+            completion = await _clients[api_key].chat.completions.create(
+                model=LLM_MODEL,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+    return completion.choices[0].message.content.strip()
+
+async def complete(task, prompt, temperature, max_tokens, api_key, timeout=LLM_TIMEOUT):
+    """
+    Sends one chat completion through the shared LLM loop and awaits it from the caller's loop.
+    Raises TimeoutError after `timeout` seconds; cancelling the caller cancels the request.
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        _chat(task, prompt, temperature, max_tokens, api_key), _llm_loop()
+    )
+    return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+async def generate_chairman_note_async(points, timeout=LLM_TIMEOUT):
+    """
+    Generates a professional chairman's welcome note paragraph from a list of points.
+    """
+    if not points or all(not p.strip() for p in points):
+        return ""
+
+    try:
+        api_key = get_api_key()
         if not api_key:
             return "Error: GROQ_API_KEY not found. Please set it in .streamlit/secrets.toml or as an environment variable."
 
-        client = Groq(api_key=api_key)
-        
-        # Filter out empty points
-        valid_points = [p.strip() for p in points if p.strip()]
-        points_str = "\n".join([f"- {p}" for p in valid_points])
-
-        prompt = f"""
-You are an expert secretary drafting minutes of a meeting. 
-Based on the following points, generate a professional, polite, and concise "Closing Remark" paragraph in Malay (Bahasa Melayu), as per the standard format for formal minutes of meeting in Malaysia.
+        prompt = CHAIRMAN_NOTE_PROMPT.format(points=format_points(points))
+        return await complete("generate_chairman_note", prompt, 0.7, 500, api_key, timeout)
 
-Points:
-{points_str}
+    except asyncio.TimeoutError:
+        return f"Error: The LLM did not respond within {timeout:g}s."
+    except Exception as e:
+        return f"Error during generation: {str(e)}"
 
-The output should be a single paragraph. Do not include any other text or formatting.
-"""
+async def generate_closing_remark_async(points, timeout=LLM_TIMEOUT):
+    """
+    Generates a professional closing remark paragraph from a list of points.
+    """
+    if not points or all(not p.strip() for p in points):
+        return ""
 
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a professional secretary crafting meeting minutes."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=300
-        )
+    try:
+        api_key = get_api_key()
+        if not api_key:
+            return "Error: GROQ_API_KEY not found. Please set it in .streamlit/secrets.toml or as an environment variable."
 
-        return completion.choices[0].message.content.strip()
+        prompt = CLOSING_REMARK_PROMPT.format(points=format_points(points))
+        return await complete("generate_closing_remark", prompt, 0.7, 300, api_key, timeout)
 
+    except asyncio.TimeoutError:
+        return f"Error: The LLM did not respond within {timeout:g}s."
     except Exception as e:
         return f"Error during generation: {str(e)}"
 
-def summarize_financial_report(pdf_file):
+async def summarize_financial_report_async(pdf_file, timeout=LLM_TIMEOUT):
     """
     Summarizes a financial report PDF using an LLM.
     """
-    import pypdf
-    
     try:
-        # Extract text from PDF
-        reader = pypdf.PdfReader(pdf_file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-            
+        # Text extraction is CPU-bound; keep it off the caller's event loop
+        text = await asyncio.to_thread(extract_pdf_text, pdf_file)
+
         if not text.strip():
             return "Error: Could not extract text from the PDF. It might be an image-based PDF."
-            
+
         # Limit text length to avoid token limits (rough truncation)
-        text = text[:15000] 
+        text = text[:15000]
 
-        # Retrieve API key
-        import os
-        api_key = None
-        try:
-            api_key = st.secrets.get("GROQ_API_KEY")
-        except FileNotFoundError:
-            pass
-        
-        if not api_key:
-            api_key = os.environ.get("GROQ_API_KEY")
-            
+        api_key = get_api_key()
         if not api_key:
             return "Error: GROQ_API_KEY not found."
 
-        client = Groq(api_key=api_key)
-        
-        prompt = f"""
-You are an expert secretary drafting minutes of a meeting.
-Please analyze the following text extracted from a quarterly financial statement PDF.
-Summarize the key financial highlights into a single, professional paragraph in Malay (Bahasa Melayu).
-Focus on:
-1. Total Income (Pendapatan)
-2. Total Expenditure (Perbelanjaan)
-3. Current Balance (Baki Semasa)
-4. Any significant anomalies or big items mentioned.
-
-Do not use bullet points. Write it as a narrative paragraph suitable for "Agenda 4: Laporan Kewangan".
-
-Extracted Text:
-{text}
-"""
-
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a professional secretary crafting meeting minutes."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.5,
-            max_tokens=400
-        )
-
-        return completion.choices[0].message.content.strip()
+        prompt = FINANCIAL_SUMMARY_PROMPT.format(text=text)
+        return await complete("summarize_financial_report", prompt, 0.5, 400, api_key, timeout)
 
+    except asyncio.TimeoutError:
+        return f"Error: The LLM did not respond within {timeout:g}s."
     except Exception as e:
         return f"Error during summarization: {str(e)}"
 
-def generate_new_matter(points):
+async def generate_new_matter_async(points, timeout=LLM_TIMEOUT):
     """
     Generates a professional paragraph for a new agenda item from a list of points.
     """
@@ -181,47 +211,29 @@ def generate_new_matter(points):
         return ""
 
     try:
-        # Retrieve API key
-        import os
-        api_key = None
-        try:
-            api_key = st.secrets.get("GROQ_API_KEY")
-        except FileNotFoundError:
-            pass
-        
-        if not api_key:
-            api_key = os.environ.get("GROQ_API_KEY")
-            
+        api_key = get_api_key()
         if not api_key:
             return "Error: GROQ_API_KEY not found."
 
-        client = Groq(api_key=api_key)
-        
-        # Filter out empty points
-        valid_points = [p.strip() for p in points if p.strip()]
-        points_str = "\n".join([f"- {p}" for p in valid_points])
+        prompt = NEW_MATTER_PROMPT.format(points=format_points(points))
+        return await complete("generate_new_matter", prompt, 0.7, 500, api_key, timeout)
 
-        prompt = f"""
-You are an expert secretary drafting minutes of a meeting. 
-Based on the following points, generate a professional, detailed, and concise paragraph for a new agenda item in Malay (Bahasa Melayu), as per the standard format for formal minutes of meeting in Malaysia.
+    except asyncio.TimeoutError:
+        return f"Error: The LLM did not respond within {timeout:g}s."
+    except Exception as e:
+        return f"Error during generation: {str(e)}"
 
-Points:
-{points_str}
+# Synchronous wrappers for the Streamlit script thread and the CLIs. They block the
+# calling thread only; the request itself still goes through the shared loop and limit.
 
-The output should be a single paragraph describing the discussion or decision. Do not include any other text or formatting.
-"""
+def generate_chairman_note(points):
+    return asyncio.run(generate_chairman_note_async(points))
 
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a professional secretary crafting meeting minutes."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=500
-        )
+def generate_closing_remark(points):
+    return asyncio.run(generate_closing_remark_async(points))
 
-        return completion.choices[0].message.content.strip()
+def summarize_financial_report(pdf_file):
+    return asyncio.run(summarize_financial_report_async(pdf_file))
 
-    except Exception as e:
-        return f"Error during generation: {str(e)}"
+def generate_new_matter(points):
+    return asyncio.run(generate_new_matter_async(points))
@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    # pandas/numpy scalars leak in from st.data_editor via to_dict('records')
+    if hasattr(obj, "item"):
+        return obj.item()
+    return str(obj)
+
+
+def dumps_mom(state, compact=False):
+    """
+    Serializes a MOM state to UTF-8 JSON bytes.
+    Pretty output is meant for humans (downloads, drafts); compact output is
+    for machine-to-machine handoff such as the temp file fed to the PDF generator.
+    orjson is used when installed (pretty output is then indented by 2 instead of 4).
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(state, default=_default, option=option)
+
+    if compact:
+        text = json.dumps(state, ensure_ascii=False, separators=(",", ":"), default=_default)
+    else:
+        text = json.dumps(state, ensure_ascii=False, indent=4, default=_default)
+    return text.encode("utf-8")
+
+
+def loads_mom(raw):
+    """
+    Parses JSON from bytes or str. Returns the raw decoded value (dict or list).
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode("utf-8")
+    return json.loads(raw)
+
+
+def validate_mom(data):
+    """
+    Returns the MOM dict from decoded JSON, unwrapping list-wrapped files ([ {...} ]).
+    Raises ValueError if no MOM object can be found.
+    """
+    if isinstance(data, list):
+        if len(data) > 0 and isinstance(data[0], dict):
+            return data[0]
+        raise ValueError("Invalid MOM JSON: expected a list containing a dict.")
+    if not isinstance(data, dict):
+        raise ValueError(f"Invalid MOM JSON: expected dict or list of dicts, got {type(data).__name__}.")
+    return data
+
+
+def load_mom_file(path, validate=True):
+    with open(path, "rb") as f:
+        data = loads_mom(f.read())
+    return validate_mom(data) if validate else data
+
+
+def atomic_write_bytes(path, data):
+    """
+    Writes bytes atomically: the data goes to a temp file in the same directory
+    which then replaces the target, so readers never see a partial file.
+    """
+    dest_dir = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", prefix=".mom_", dir=dest_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600 files; keep the target's mode (or a normal umask-based one)
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def save_mom_file(state, path, compact=False):
+    return atomic_write_bytes(path, dumps_mom(state, compact=compact))
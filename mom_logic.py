@@ -1,6 +1,7 @@
-import json
 import re
 from datetime import date
+from attendance import Attendance, ROSTER_COLUMNS, person_key
+from mom_io import save_mom_file
 
 def today_str():
     return date.today().strftime("%d/%m/%Y")
@@ -123,36 +124,10 @@ def ingest_previous_mom(json_data):
 
     # Ingest Attendance
     def parse_attendance(attn_data):
+        # Support both { nama: [], jawatan: [] } and { nama: [ { nama, jawatan } ] }
         if not isinstance(attn_data, dict):
             return []
-        
-        # Support both { nama: [], jawatan: [] } and [ { nama, jawatan } ]
-        names = attn_data.get("Nama", attn_data.get("nama", []))
-        if isinstance(names, list) and names and not isinstance(names[0], dict):
-            # Column-based structure
-            jawatan = attn_data.get("Jawatan", attn_data.get("jawatan", []))
-            singkatan = attn_data.get("Singkatan", attn_data.get("singkatan", []))
-            records = []
-            for i in range(len(names)):
-                records.append({
-                    "siri": str(i+1),
-                    "nama": names[i],
-                    "jawatan": jawatan[i] if i < len(jawatan) else "",
-                    "singkatan": singkatan[i] if i < len(singkatan) else ""
-                })
-            return records
-        elif isinstance(names, list) and names and isinstance(names[0], dict):
-            # List of dicts structure
-            records = []
-            for i, d in enumerate(names):
-                records.append({
-                    "siri": d.get("siri", str(i+1)),
-                    "nama": d.get("nama", ""),
-                    "jawatan": d.get("jawatan", ""),
-                    "singkatan": d.get("singkatan", "")
-                })
-            return records
-        return []
+        return Attendance.parse(attn_data).to_records(("siri", "nama", "jawatan", "singkatan"))
 
     # Handle various Hadir/Tidak Hadir keys
     hadir_key = find_key(json_data, "Hadir")
@@ -299,7 +274,127 @@ def ingest_previous_mom(json_data):
             
     return new_state
 
-def save_mom_to_json(state, filename):
-    with open(filename, 'w') as f:
-        json.dump(state, f, indent=4)
-    return filename
+def split_attendance(ajk_df, previous_absent=None):
+    """
+    Splits the AJK roster DataFrame into (hadir, tidak_hadir) record lists using the 'Hadir' column.
+    Absentees keep the 'sebab' already recorded for them in previous_absent (matched by singkatan, else nama).
+    """
+    roster = Attendance.from_frame(ajk_df)
+    if "Hadir" in ajk_df.columns:
+        present = ajk_df["Hadir"].fillna("").astype(str).str.strip().eq("Ya").tolist()
+    else:
+        present = [False] * len(roster)
+
+    hadir = roster.select(present)
+    tidak_hadir = roster.select(not p for p in present)
+
+    previous = Attendance.from_records(p for p in previous_absent or [] if isinstance(p, dict))
+    sebab_by_key = previous.sebab_by_key()
+    tidak_hadir.sebab = [sebab_by_key.get(key, "") for key in tidak_hadir.keys()]
+
+    return hadir.to_records(("siri", "nama", "jawatan", "singkatan")), tidak_hadir.to_records()
+
+def roster_member(row):
+    """
+    Attendance record for a roster (ajk.csv) row dict, or None for a deleted row.
+    Missing cells become "", as in Attendance.from_frame.
+    """
+    if row is None:
+        return None
+    record = {field: row.get(column) for column, field in ROSTER_COLUMNS.items()}
+    return {k: "" if v is None or v != v else str(v) for k, v in record.items()}
+
+def roster_rows(base_rows, changes):
+    """
+    {("base", i) or ("added", j): roster row dict or None} for the rows st.data_editor
+    changes touch, as they stand after those changes.
+    """
+    rows = {("base", int(i)): {**base_rows[int(i)], **fields}
+            for i, fields in changes.get("edited_rows", {}).items()}
+    rows.update({("base", i): None for i in changes.get("deleted_rows", [])})
+    rows.update({("added", j): row for j, row in enumerate(changes.get("added_rows", []))})
+    return rows
+
+def apply_roster_changes(hadir, tidak_hadir, base_rows, changes, applied=None):
+    """
+    Updates the attendance lists in place for the roster rows st.data_editor changes
+    touch (edited_rows/added_rows/deleted_rows, relative to base_rows), moving a member
+    between hadir and tidak_hadir when their 'Hadir' cell changes. applied is the changes
+    dict of the previous call: rows it already covered are skipped, and every other
+    member keeps their entry (e.g. attendance loaded from a previous MOM).
+    """
+    old_rows = roster_rows(base_rows, applied or {})
+    new_rows = roster_rows(base_rows, changes)
+    order = None
+    for ref in dict.fromkeys(list(old_rows) + list(new_rows)):
+        kind, index = ref
+        old = old_rows.get(ref, base_rows[index] if kind == "base" else None)
+        new = new_rows.get(ref, base_rows[index] if kind == "base" else None)
+        if old == new:
+            continue
+
+        # Drop the member's current entry, keeping its reason for absence
+        sebab = ""
+        old_member = roster_member(old)
+        if old_member:
+            old_key = person_key(old_member["singkatan"], old_member["nama"])
+            for records in (hadir, tidak_hadir):
+                for i, record in enumerate(records):
+                    if person_key(record.get("singkatan", ""), record.get("nama", "")) == old_key:
+                        sebab = record.get("sebab", sebab)
+                        del records[i]
+                        break
+
+        member = roster_member(new)
+        if not member or not (member["nama"] or member["singkatan"]):
+            continue
+        present = str(new.get("Hadir") or "").strip() == "Ya"
+        if not present:
+            member["sebab"] = sebab
+        if order is None:
+            # Roster position of each member, so entries stay in roster order
+            order = {person_key(r["singkatan"], r["nama"]): i
+                     for i, r in enumerate(map(roster_member, base_rows))}
+            order.update({person_key(r["singkatan"], r["nama"]): len(base_rows) + j
+                          for j, r in enumerate(map(roster_member, changes.get("added_rows", [])))})
+        rank = order.get(person_key(member["singkatan"], member["nama"]))
+        records = hadir if present else tidak_hadir
+        position = len(records)
+        if rank is not None:
+            for i, record in enumerate(records):
+                other = order.get(person_key(record.get("singkatan", ""), record.get("nama", "")))
+                if other is not None and other > rank:
+                    position = i
+                    break
+        records.insert(position, member)
+    return hadir, tidak_hadir
+
+def apply_editor_changes(rows, base_rows, changes, columns):
+    """
+    Applies st.data_editor changes (edited_rows/added_rows/deleted_rows, all relative to base_rows) to rows in place.
+    Cell edits only touch the edited fields; rows is rebuilt from base_rows only after a deletion
+    or when rows does not yet mirror base_rows (e.g. the placeholder row of an empty table).
+    """
+    def clean(record):
+        return {k: ("" if v is None else v) for k, v in record.items()}
+
+    edited = {int(i): clean(fields) for i, fields in changes.get("edited_rows", {}).items()}
+    added = [{**dict.fromkeys(columns, ""), **clean(r)} for r in changes.get("added_rows", [])]
+    deleted = set(changes.get("deleted_rows", []))
+
+    if deleted or len(rows) < len(base_rows):
+        kept = []
+        for i, record in enumerate(base_rows):
+            if i not in deleted:
+                kept.append({**record, **edited.get(i, {})})
+        rows[:] = kept + added
+        return rows
+
+    for i, fields in edited.items():
+        rows[i].update(fields)
+    del rows[len(base_rows):]
+    rows.extend(added)
+    return rows
+
+def save_mom_to_json(state, filename, compact=False):
+    return save_mom_file(state, filename, compact=compact)
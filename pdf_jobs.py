@@ -0,0 +1,135 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from mom_io import loads_mom
+
+
+def mom_hash(mom_bytes):
+    return hashlib.sha256(mom_bytes).hexdigest()
+
+
+def render_reportlab(data, progress_callback=None, profile=None):
+    # ReportLab is loaded by the first render rather than at app start
+    from generate_mom_reportlab import MOMReportLab
+    buffer = BytesIO()
+    MOMReportLab(output_pdf=buffer, data=data, profile=profile).create_pdf(progress_callback=progress_callback)
+    return buffer.getvalue()
+
+
+def render_docx(data, progress_callback=None):
+    # Native python-docx export; fast enough that progress is not reported
+    from generate_mom_docx import MOMDocx
+    return MOMDocx(data=data).to_bytes()
+
+
+def render_html(data, progress_callback=None):
+    # Standalone printable page (generate_mom_html), UTF-8 encoded
+    from generate_mom_html import render_html as render_page
+    return render_page(data).encode("utf-8")
+
+
+class RenderJob:
+    """
+    State of one background render. status: queued, running, done or failed.
+    output holds the rendered document bytes once done.
+    """
+    def __init__(self, key):
+        self.key = key
+        self.status = "queued"
+        self.progress = 0.0
+        self.output = None
+        self.error = None
+        self.future = None
+        self.started = None
+        self.finished = None
+        self._size_est = 0
+
+    @property
+    def pending(self):
+        return self.status in ("queued", "running")
+
+    @property
+    def duration(self):
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    def on_progress(self, typ, value):
+        if typ == "SIZE_EST":
+            self._size_est = value
+        elif typ == "PROGRESS" and self._size_est:
+            self.progress = min(value / self._size_est, 1.0)
+
+
+class RenderQueue:
+    """
+    Process-wide render worker. Renders run on a thread pool so the Streamlit
+    script thread never blocks, and results are kept by a hash of the serialized MOM
+    so an unchanged draft is returned without rendering again.
+    render is called as render(data, progress_callback) and returns the document bytes;
+    the default is the ReportLab PDF.
+    """
+    def __init__(self, max_workers=4, max_results=32, render=render_reportlab, name="mom-render"):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.max_workers = max_workers
+        self.max_results = max_results
+        self.render = render
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is not None:
+                self.jobs.move_to_end(key)
+            return job
+
+    def pending_count(self):
+        with self.lock:
+            return sum(1 for job in self.jobs.values() if job.pending)
+
+    def submit(self, mom_bytes):
+        """
+        Queues a render of the serialized MOM (bytes from mom_io.dumps_mom) unless an
+        identical draft is already rendering or rendered. Returns its RenderJob.
+        """
+        key = mom_hash(mom_bytes)
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is not None and job.status != "failed":
+                self.jobs.move_to_end(key)
+                return job
+            job = RenderJob(key)
+            self.jobs[key] = job
+            self._evict()
+            # Parse our own copy so later edits to the session cannot race the render;
+            # the future is set under the lock so concurrent callers always see it
+            job.future = self.executor.submit(self._run, job, loads_mom(mom_bytes))
+        return job
+
+    def _run(self, job, data):
+        job.status = "running"
+        job.started = time.perf_counter()
+        try:
+            job.output = self.render(data, job.on_progress)
+            job.progress = 1.0
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished = time.perf_counter()
+
+    def _evict(self):
+        # Drop the oldest finished results; never drop a render still in flight
+        while len(self.jobs) > self.max_results:
+            for key, job in self.jobs.items():
+                if not job.pending:
+                    del self.jobs[key]
+                    break
+            else:
+                break
@@ -0,0 +1,64 @@
+import os
+import threading
+from importlib.util import find_spec
+from io import BytesIO
+
+# Streamlit serves <app dir>/static at app/static/ when server.enableStaticServing is on
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_URL = "app/static"
+PREVIEW_PREFIX = "mom_preview_"
+
+# PDFium is not thread-safe; concurrent sessions render on their own script threads
+_pdfium_lock = threading.Lock()
+
+
+def thumbnails_available():
+    # Checked without importing: pypdfium2 loads its native library on import
+    return find_spec("pypdfium2") is not None
+
+
+def render_thumbnails(pdf_bytes, max_pages=2, width_px=900):
+    """
+    Rasterizes the first max_pages pages to PNG bytes at screen width (needs pypdfium2).
+    Returns (list of PNG bytes, total page count).
+    """
+    import pypdfium2 as pdfium
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(pdf_bytes)
+        try:
+            images = []
+            for i in range(min(max_pages, len(pdf))):
+                page = pdf[i]
+                bitmap = page.render(scale=width_px / page.get_width())
+                # A small palette keeps text crisp at about a quarter of the truecolour size
+                image = bitmap.to_pil().quantize(colors=64)
+                buffer = BytesIO()
+                image.save(buffer, format="PNG", optimize=True)
+                images.append(buffer.getvalue())
+            return images, len(pdf)
+        finally:
+            pdf.close()
+
+
+def publish_static_pdf(pdf_bytes, key, keep=20):
+    """
+    Writes the PDF to the static folder as mom_preview_<key>.pdf and returns its URL,
+    so the browser fetches it over plain HTTP instead of a base64 data URI.
+    Only the newest `keep` previews are kept.
+    """
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    filename = f"{PREVIEW_PREFIX}{key}.pdf"
+    path = os.path.join(STATIC_DIR, filename)
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(pdf_bytes)
+
+    previews = sorted(
+        (os.path.join(STATIC_DIR, f) for f in os.listdir(STATIC_DIR) if f.startswith(PREVIEW_PREFIX)),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    for old in previews[keep:]:
+        if old != path:
+            os.remove(old)
+    return f"{STATIC_URL}/{filename}"
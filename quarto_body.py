@@ -0,0 +1,298 @@
+"""
+Builds the Markdown body of the Quarto minutes ahead of time, in the calling process.
+
+mom_template.qmd (LaTeX PDF/DOCX) and mom_template_typ.qmd (Typst) hold only the
+front matter; generate_mom appends the body produced here, so Quarto renders a static
+document without starting a Jupyter kernel.
+"""
+import re
+from collections import deque
+
+TARGETS = ("latex", "typst")
+AJK_COLWIDTHS = ': {tbl-colwidths="[10, 65, 25]"}\n\n'
+
+LEVEL2_ITEM = re.compile(r'^\([0-9]+\)')
+MANUAL_LIST_ITEM = re.compile(r'^(\(?[a-z0-9]+\s*[.)]|\*|-|\+)', re.IGNORECASE)
+TABLE_SEPARATOR = re.compile(r'^\|[\s:-]*\|')
+
+
+def get_case_insensitive(d, key, default=None):
+    if not isinstance(d, dict):
+        return default
+    for k, v in d.items():
+        if k.lower() == key.lower():
+            return v
+    return default
+
+
+def table_title(title, target):
+    # Table titles are pulled out of the table and centered above it
+    if target == "typst":
+        return ["\n\n```{=typst}", f"#align(center)[{title}]", "```\n\n"]
+    return [f"\n\n\\begin{{center}} {title} \\end{{center}}\n\n"]
+
+
+def classify_line(raw):
+    """
+    Returns (raw, stripped, is_row, title) for one line. title is the text of a table
+    title row (| TITLE | | |: several cells, only the first filled), else None.
+    """
+    stripped = raw.strip()
+    if not stripped.startswith('|'):
+        return raw, stripped, False, None
+    title = None
+    if stripped.endswith('|') and len(stripped) > 1:
+        first, sep, rest = stripped[1:-1].partition('|')
+        if sep and not rest.replace('|', '').strip():
+            title = first.strip()
+    return raw, stripped, True, title
+
+
+def rewrite_keterangan(lines, target="latex"):
+    """
+    Yields the output lines for an iterable of Keterangan lines in a single pass.
+    A title row followed by a separator and a header row is rewritten as a centered
+    title (LaTeX or Typst markup) above a table that starts at the header; the AJK table
+    (Siri/Nama/Jawatan header) is followed by its tbl-colwidths annotation.
+    Each line is classified once, with at most two lines of lookahead.
+    """
+    source = map(classify_line, lines)
+    pending = deque()
+
+    def lookahead(n):
+        while len(pending) < n:
+            line = next(source, None)
+            if line is None:
+                return False
+            pending.append(line)
+        return True
+
+    in_ajk_table = False
+    while lookahead(1):
+        raw, stripped, is_row, title = pending.popleft()
+        if title is not None and lookahead(2) and TABLE_SEPARATOR.match(pending[0][1]) and pending[1][2]:
+            separator, header = pending.popleft(), pending.popleft()
+            yield from table_title(title, target)
+            yield header[0]
+            yield separator[0]
+            header_row = header[0]
+            if "Siri" in header_row and "Nama" in header_row and "Jawatan" in header_row:
+                in_ajk_table = True
+            continue
+
+        if in_ajk_table and not is_row:
+            yield AJK_COLWIDTHS
+            in_ajk_table = False
+        yield raw
+
+    # Table was the last thing in the text
+    if in_ajk_table:
+        yield AJK_COLWIDTHS
+
+
+def format_keterangan(text, target="latex"):
+    if not isinstance(text, str):
+        return text
+    if '|' not in text:
+        return text
+    return '\n'.join(rewrite_keterangan(text.split('\n'), target))
+
+
+def meeting_title(data):
+    jenis = data.get("Jenis", "agm")
+    if jenis == "exco":
+        title_text = "MINIT MESYUARAT JAWATANKUASA EKSEKUTIF"
+    else:
+        title_text = "MINIT MESYUARAT AGUNG TAHUNAN"
+
+    siri = data.get("Siri", "N/A")
+    tarikh = data.get("Tarikh", "N/A")
+    year_part = tarikh.split("/")[-1] if "/" in tarikh else "2025"
+    tahun = year_part if len(year_part) == 4 else "20" + year_part
+    return title_text, siri, tarikh, tahun
+
+
+def render_title_block(data, target="latex"):
+    title_text, siri, tarikh, tahun = meeting_title(data)
+    if target == "typst":
+        return "\n".join([
+            "```{=typst}",
+            '#align(center)[',
+            '  #image("logo.png", width: 100%)\n',
+            f'  #text(size: 1.4em, weight: "bold")[{title_text}]\n',
+            f'  #text(size: 1.2em)[Siri {siri}/{tahun} pada {tarikh}]',
+            ']',
+            "```",
+        ]) + "\n"
+    return "\n".join([
+        '::: {.content-visible when-format="pdf"}',
+        '\\begin{center}',
+        '\\includegraphics[width=\\textwidth]{logo.png}\n',
+        f'\\Large\\textbf{{{title_text}}}\n',
+        f'\\large Siri {siri}/{tahun} pada {tarikh}',
+        '\\end{center}',
+        ':::',
+        '::: {.content-visible unless-format="pdf"}',
+        '<div align="center">',
+        '![](logo.png){width=100%}\n',
+        f'# {title_text}',
+        f'### Siri {siri}/{tahun} pada {tarikh}',
+        '</div>',
+        ':::',
+    ]) + "\n"
+
+
+def attendance_table(emit, nama_list, jawatan_list):
+    emit("| Name | Designation |")
+    emit("| --- | --- |")
+    for i in range(len(nama_list)):
+        nama = nama_list[i] if i < len(nama_list) else ""
+        jawatan = jawatan_list[i] if i < len(jawatan_list) else ""
+        emit(f"| {nama} | {jawatan} |")
+
+
+def render_keterangan(emit, keterangan, target):
+    formatted_keterangan = format_keterangan(keterangan, target)
+    if isinstance(formatted_keterangan, list):
+        for k in formatted_keterangan:
+            emit(f"{k}")
+        return
+
+    # Split into blocks by double newlines to keep tables and raw LaTeX/Typst intact
+    raw_prefix = '```{=typst}' if target == "typst" else '\\'
+    for block in formatted_keterangan.split('\n\n'):
+        block = block.strip()
+        if not block:
+            continue
+
+        if block.startswith('|') or block.startswith(raw_prefix):
+            emit(f"\n{block}\n")
+        elif block.startswith(':'):
+            emit(f"{block}\n")
+        else:
+            # Normal paragraph or list, might have manual line breaks
+            for line in block.split('\n'):
+                line = line.strip()
+                if not line:
+                    continue
+                if LEVEL2_ITEM.match(line):
+                    emit(f"        {line}  ") # 8 spaces
+                elif MANUAL_LIST_ITEM.match(line):
+                    emit(f"    {line}  ")     # 4 spaces aligns with "1. "
+                elif not line.startswith('@.'):
+                    emit(f"@.  {line}  ")
+                else:
+                    emit(f"{line}  ")
+
+
+def render_keputusan(emit, keputusan):
+    if not isinstance(keputusan, str):
+        emit(f"\n@.    **Keputusan:** {keputusan}  ")
+        return
+    # Also handle blocks/lines in Keputusan
+    for block in keputusan.split('\n\n'):
+        block = block.strip()
+        if not block:
+            continue
+        first = True
+        for line in block.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            if first:
+                emit(f"\n@.    **Keputusan:** {line}  ")
+                first = False
+            elif LEVEL2_ITEM.match(line):
+                emit(f"            {line}  ") # 12 spaces
+            elif MANUAL_LIST_ITEM.match(line):
+                emit(f"        {line}  ")    # 8 spaces aligns with text after "Keputusan: "
+            else:
+                emit(f"      {line}  ")
+
+
+def render_minutes(data, target="latex"):
+    """
+    Returns the attendance, agenda, closing and signatory sections as Markdown.
+    """
+    out = []
+    emit = out.append
+
+    # --- HADIR ---
+    emit("### HADIR")
+    hadir = data.get('Hadir', {})
+    if isinstance(hadir, str):
+        emit(hadir)
+    elif isinstance(hadir, dict):
+        nama_list = get_case_insensitive(hadir, 'nama', [])
+        if nama_list:
+            attendance_table(emit, nama_list, get_case_insensitive(hadir, 'jawatan', []))
+        else:
+            emit("Tiada rekod kehadiran berstruktur.")
+    else:
+        emit("Tiada maklumat kehadiran.")
+
+    # --- TIDAK HADIR ---
+    tidak_hadir = get_case_insensitive(data, 'tidak hadir (dengan maaf)', {})
+    if tidak_hadir:
+        emit("\n### TIDAK HADIR (DENGAN MAAF)")
+        if isinstance(tidak_hadir, str):
+            emit(tidak_hadir)
+        elif isinstance(tidak_hadir, dict):
+            t_nama_list = get_case_insensitive(tidak_hadir, 'nama', [])
+            if t_nama_list:
+                attendance_table(emit, t_nama_list, get_case_insensitive(tidak_hadir, 'jawatan', []))
+            else:
+                emit("Tiada rekod tidak hadir berstruktur.")
+
+    emit("\n---\n")
+
+    # --- AGENDA ---
+    agenda_data = data.get('Agenda', {})
+    agenda_items = []
+    if isinstance(agenda_data, dict) and agenda_data:
+        # Nested Agenda: {"1": {...}, "2": {...}}
+        for key in sorted(agenda_data.keys(), key=lambda x: int(x) if x.isdigit() else 999):
+            agenda_items.append(agenda_data[key])
+    else:
+        # Flat keys: "Agenda_1", "Agenda_2"
+        agenda_keys = sorted([k for k in data.keys() if k.startswith('Agenda_')],
+                             key=lambda x: int(x.split('_')[1]) if x.split('_')[1].isdigit() else 999)
+        for k in agenda_keys:
+            agenda_items.append(data[k])
+
+    for i, item in enumerate(agenda_items, 1):
+        perkara = get_case_insensitive(item, 'perkara', '').upper()
+        emit(f"### AGENDA {i}: {perkara}")
+        render_keterangan(emit, get_case_insensitive(item, 'keterangan', ''), target)
+        keputusan = get_case_insensitive(item, 'keputusan', '')
+        if keputusan:
+            render_keputusan(emit, keputusan)
+        emit("\n")
+
+    emit("\n---\n")
+
+    # --- PENUTUP ---
+    emit("### PENUTUP")
+    emit(data.get('Penutup', ''))
+    emit("\n\n")
+
+    # --- SIGNATORIES ---
+    # Try multiple common keys for Disediakan/Diluluskan
+    disediakan = get_case_insensitive(data, 'disediakan oleh', get_case_insensitive(data, 'disediakan', '....................'))
+    diluluskan = get_case_insensitive(data, 'diluluskan oleh', get_case_insensitive(data, 'diluluskan', '....................'))
+    emit("**Disediakan Oleh:**  ")
+    emit(f"{disediakan}  ")
+    emit("\n**Diluluskan Oleh:**  ")
+    emit(f"{diluluskan}")
+
+    return "\n".join(str(part) for part in out) + "\n"
+
+
+def render_body(data, target="latex"):
+    """
+    Returns the whole document body (title block and minutes) for the given target,
+    "latex" (mom_template.qmd) or "typst" (mom_template_typ.qmd).
+    """
+    if target not in TARGETS:
+        raise ValueError(f"Unknown target {target!r}; expected one of {TARGETS}.")
+    return render_title_block(data, target) + "\n\n" + render_minutes(data, target)
@@ -0,0 +1,267 @@
+"""
+Headless render service: MOM JSON in, PDF/DOCX/HTML out, over HTTP.
+
+    POST /render/pdf          ReportLab PDF (MOMReportLab)
+    POST /render/pdf-compact  ReportLab PDF, "compact" profile (downsampled JPEG images)
+    POST /render/pdf-batch    ReportLab PDF, "batch" profile (compact, letterhead and
+                              signatures stamped from form XObjects)
+    POST /render/docx         native DOCX (MOMDocx, python-docx)
+    POST /render/quarto-docx  Quarto DOCX (generate_mom)
+    POST /render/html         printable HTML (MOMHtml)
+    POST /render/quarto-pdf   Quarto LaTeX PDF
+    POST /render/typst        Quarto Typst PDF
+    GET  /render/{fmt}/{key}  result of an earlier render by content hash (202 while pending)
+    GET  /health              liveness and available formats
+    GET  /metrics             request, cache and queue counters
+
+Renders run on bounded thread pools (pdf_jobs.RenderQueue) and results are cached in
+memory by the hash of the canonical MOM JSON. A request that exceeds its timeout gets a
+504 with the job key; the render carries on and a retry returns the cached result.
+
+Run locally:
+    python render_service.py --port 8765
+    uvicorn render_service:app --port 8765
+    curl -X POST --data-binary @mom.json http://127.0.0.1:8765/render/pdf -o mom.pdf
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+from collections import Counter
+from contextlib import asynccontextmanager
+from functools import partial
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+import instrumentation
+from mom_io import loads_mom, dumps_mom, validate_mom, save_mom_file
+from pdf_jobs import RenderQueue, mom_hash, render_reportlab, render_docx, render_html
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+WORKERS = int(os.environ.get("MOM_RENDER_WORKERS", "4"))
+TIMEOUT = float(os.environ.get("MOM_RENDER_TIMEOUT", "60"))
+MAX_TIMEOUT = 300.0
+MAX_PENDING = int(os.environ.get("MOM_RENDER_MAX_PENDING", "32"))
+CACHE_SIZE = int(os.environ.get("MOM_RENDER_CACHE", "64"))
+MAX_BODY = 5 * 1024 * 1024
+
+# generate_mom renders to temp_output.<ext> in the working directory, so Quarto runs
+# must not overlap whatever their format
+_quarto_lock = threading.Lock()
+
+
+def render_quarto(output_format, ext):
+    def render(data, progress_callback=None):
+        import generate_mom
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = save_mom_file(data, os.path.join(tmp, "mom.json"), compact=True)
+            output_file = os.path.join(tmp, f"mom.{ext}")
+            with _quarto_lock:
+                result = generate_mom.generate_mom(json_path, output_format, output_file)
+            if result is None or result.returncode != 0 or not os.path.exists(output_file):
+                detail = (result.stderr or result.stdout)[-1000:] if result is not None else ""
+                raise RuntimeError(f"Quarto {output_format} render failed. {detail}".strip())
+            with open(output_file, "rb") as f:
+                return f.read()
+    return render
+
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# format: (media type, file extension, render function, worker count)
+FORMATS = {
+    "pdf": ("application/pdf", "pdf", render_reportlab, WORKERS),
+    "pdf-compact": ("application/pdf", "pdf", partial(render_reportlab, profile="compact"), WORKERS),
+    "pdf-batch": ("application/pdf", "pdf", partial(render_reportlab, profile="batch"), WORKERS),
+    "docx": (DOCX_MEDIA_TYPE, "docx", render_docx, WORKERS),
+    "html": ("text/html; charset=utf-8", "html", render_html, WORKERS),
+    "quarto-docx": (DOCX_MEDIA_TYPE, "docx", render_quarto("docx", "docx"), 1),
+    "quarto-pdf": ("application/pdf", "pdf", render_quarto("pdf", "pdf"), 1),
+    "typst": ("application/pdf", "pdf", render_quarto("typst", "pdf"), 1),
+}
+# Formats that need the Quarto CLI; the others render in-process
+QUARTO_FORMATS = ("quarto-docx", "quarto-pdf", "typst")
+
+
+def quarto_available():
+    import generate_mom
+    return os.path.exists(generate_mom.QUARTO_PATH)
+
+
+def format_available(fmt):
+    return fmt not in QUARTO_FORMATS or quarto_available()
+
+
+def document_response(fmt, job, cache):
+    media_type, ext, _, _ = FORMATS[fmt]
+    return Response(job.output, media_type=media_type, headers={
+        "X-Content-Hash": job.key,
+        "X-Cache": cache,
+        "Content-Disposition": f'attachment; filename="mom_{job.key[:12]}.{ext}"',
+    })
+
+
+def error(status_code, detail, **extra):
+    return JSONResponse({"detail": detail, **extra}, status_code=status_code)
+
+
+async def read_body(request, limit=MAX_BODY):
+    """
+    The request body, or None once it is known to exceed limit bytes: from the
+    Content-Length header before anything is read, else while the body streams in.
+    """
+    try:
+        if int(request.headers.get("content-length", 0)) > limit:
+            return None
+    except ValueError:
+        pass
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def render(request):
+    fmt = request.path_params["fmt"]
+    if fmt not in FORMATS:
+        return error(404, f"Unknown format {fmt!r}. Use one of: {', '.join(FORMATS)}.")
+    metrics = request.app.state.metrics
+    metrics[f"requests.{fmt}"] += 1
+    if not format_available(fmt):
+        metrics[f"unavailable.{fmt}"] += 1
+        return error(503, f"Format {fmt!r} is not available on this server (Quarto CLI not found).")
+
+    raw = await read_body(request)
+    if raw is None:
+        return error(413, "MOM JSON too large.")
+    try:
+        data = loads_mom(raw)
+    except ValueError as e:
+        metrics["rejected"] += 1
+        return error(400, f"Invalid JSON: {e}")
+    try:
+        data = validate_mom(data)
+    except ValueError as e:
+        metrics["rejected"] += 1
+        return error(400, str(e))
+    try:
+        timeout = min(float(request.query_params.get("timeout", TIMEOUT)), MAX_TIMEOUT)
+    except ValueError:
+        return error(400, "timeout must be a number of seconds.")
+
+    # Canonical bytes, so formatting differences in the request do not defeat the cache
+    mom_bytes = dumps_mom(data, compact=True)
+    queue = request.app.state.queues[fmt]
+    existing = queue.get(mom_hash(mom_bytes))
+    if existing is not None and existing.status == "done":
+        metrics["cache_hits"] += 1
+        return document_response(fmt, existing, "hit")
+    if (existing is None or existing.status == "failed") and queue.pending_count() >= MAX_PENDING:
+        metrics["overloaded"] += 1
+        return error(503, "Render queue is full, retry later.")
+
+    job = queue.submit(mom_bytes)
+    try:
+        # shield: a timed-out request must not cancel the render other requests may share
+        await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout)
+    except asyncio.TimeoutError:
+        metrics["timeouts"] += 1
+        return error(504, f"Render did not finish within {timeout:g}s; it continues in the background.",
+                     key=job.key, status=job.status, location=f"/render/{fmt}/{job.key}")
+
+    if job.status == "failed":
+        metrics[f"failures.{fmt}"] += 1
+        return error(500, f"Render failed: {job.error}", key=job.key)
+    metrics[f"renders.{fmt}"] += 1
+    metrics[f"render_ms.{fmt}"] += round(job.duration * 1000)
+    return document_response(fmt, job, "wait" if job is existing else "miss")
+
+
+async def render_result(request):
+    fmt, key = request.path_params["fmt"], request.path_params["key"]
+    if fmt not in FORMATS:
+        return error(404, f"Unknown format {fmt!r}.")
+    job = request.app.state.queues[fmt].get(key)
+    if job is None:
+        return error(404, "No render with this key (it may have been evicted).")
+    if job.pending:
+        return JSONResponse({"key": key, "status": job.status, "progress": round(job.progress, 3)},
+                            status_code=202)
+    if job.status == "failed":
+        return error(500, f"Render failed: {job.error}", key=key)
+    request.app.state.metrics["cache_hits"] += 1
+    return document_response(fmt, job, "hit")
+
+
+async def health(request):
+    return JSONResponse({
+        "status": "ok",
+        "formats": {fmt: format_available(fmt) for fmt in FORMATS},
+    })
+
+
+async def metrics(request):
+    state = request.app.state
+    return JSONResponse({
+        "counters": dict(sorted(state.metrics.items())),
+        "queues": {fmt: {"workers": queue.max_workers, "pending": queue.pending_count(),
+                         "cached": len(queue.jobs)}
+                   for fmt, queue in state.queues.items()},
+        "timings": instrumentation.summarize() if instrumentation.is_enabled() else None,
+    })
+
+
+def create_app(workers=WORKERS):
+    queues = {}
+    for fmt, (_, _, render_fn, fmt_workers) in FORMATS.items():
+        queues[fmt] = RenderQueue(max_workers=fmt_workers if fmt in QUARTO_FORMATS else workers,
+                                  max_results=CACHE_SIZE, render=render_fn, name=f"mom-{fmt}")
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        for queue in queues.values():
+            queue.executor.shutdown(wait=False, cancel_futures=True)
+
+    app = Starlette(routes=[
+        Route("/render/{fmt}", render, methods=["POST"]),
+        Route("/render/{fmt}/{key}", render_result, methods=["GET"]),
+        Route("/health", health, methods=["GET"]),
+        Route("/metrics", metrics, methods=["GET"]),
+    ], lifespan=lifespan)
+    app.state.queues = queues
+    app.state.metrics = Counter()
+    return app
+
+
+def __getattr__(name):
+    # render_service:app for ASGI servers, created on first access rather than at import
+    global app
+    if name == "app":
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve MOM renders over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="ReportLab, DOCX and HTML render threads per format")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    # Templates, logo and signature images are resolved relative to the repo
+    os.chdir(BASE_DIR)
+    uvicorn.run(create_app(workers=args.workers), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
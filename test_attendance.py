@@ -0,0 +1,88 @@
+"""
+Tests for the column-stored Attendance (python -m pytest -q): parsing the stored
+shapes, selection, lookups and quorum.
+"""
+import pandas as pd
+
+from attendance import Attendance, attendance_rates, has_quorum, quorum_size
+
+RECORDS = [{"siri": "1", "nama": "Ahmad", "jawatan": "Presiden", "singkatan": "AH"},
+           {"siri": "2", "nama": "Bakar", "jawatan": "Setiausaha", "singkatan": "BK"},
+           {"siri": "3", "nama": "Chong", "jawatan": "Bendahari", "singkatan": "", "sebab": "Kursus"}]
+
+
+def test_parse_records_and_names():
+    attn = Attendance.parse(RECORDS)
+    assert attn.nama == ["Ahmad", "Bakar", "Chong"]
+    assert attn.sebab == ["", "", "Kursus"]
+    assert attn.to_records()[0] == dict(RECORDS[0], sebab="")
+    # Plain names are numbered by position
+    names = Attendance.parse(["Ahmad", "Bakar"])
+    assert names.siri == ["1", "2"]
+    assert names.jawatan == ["", ""]
+
+
+def test_parse_legacy_columns():
+    attn = Attendance.parse({"Nama": ["A", "B", "C"], "Jawatan": ["Presiden"], "singkatan": ["AH", "BK", "CH", "X"]})
+    assert attn.siri == ["1", "2", "3"]
+    assert attn.jawatan == ["Presiden", "", ""]
+    assert attn.singkatan == ["AH", "BK", "CH"]
+    # A short or partly blank Siri column keeps the positional number for the rest
+    assert Attendance.parse({"Siri": ["1"], "Nama": ["A", "B", "C"]}).siri == ["1", "2", "3"]
+    assert Attendance.parse({"Siri": [7, "", None], "Nama": ["A", "B", "C"]}).siri == ["7", "2", "3"]
+
+
+def test_parse_other_shapes():
+    assert Attendance.parse({"Nama": RECORDS}).nama == ["Ahmad", "Bakar", "Chong"]
+    for data in (None, "Ahmad", {}, {"Nama": []}, {"Nama": "Ahmad"}, 3):
+        assert len(Attendance.parse(data)) == 0
+    attn = Attendance.parse(RECORDS)
+    assert Attendance.parse(attn) is attn
+
+
+def test_columns_and_frame_round_trip():
+    attn = Attendance.parse(RECORDS)
+    assert Attendance.parse(attn.to_columns()).to_records() == attn.to_records()
+    frame = pd.DataFrame({"Siri": [1, 2], "Nama": ["Ahmad", None], "Hadir": ["Ya", "Tidak"]})
+    roster = Attendance.from_frame(frame)
+    assert roster.siri == ["1", "2"]
+    assert roster.nama == ["Ahmad", ""]
+    assert roster.singkatan == ["", ""]
+    assert list(roster.to_frame().columns) == ["Siri", "Nama", "Jawatan", "Singkatan"]
+
+
+def test_select():
+    attn = Attendance.parse(RECORDS)
+    picked = attn.select([True, False, True])
+    assert picked.nama == ["Ahmad", "Chong"]
+    assert picked.sebab == ["", "Kursus"]
+    assert len(attn.select([False] * 3)) == 0
+
+
+def test_lookups():
+    attn = Attendance.parse(RECORDS + [{"siri": "4", "nama": "Ahmad Dua", "singkatan": "AH"}])
+    # First entry wins for a repeated singkatan; blanks are not indexed
+    assert attn.by_singkatan(" AH ")["nama"] == "Ahmad"
+    assert attn.by_singkatan("") is None
+    assert attn.by_singkatan("XX") is None
+    assert attn.by_siri(3)["nama"] == "Chong"
+    assert attn.by_siri("9") is None
+    assert attn.keys() == ["AH", "BK", "Chong", "AH"]
+    assert attn.sebab_by_key() == {"Chong": "Kursus"}
+
+
+def test_quorum():
+    assert quorum_size(0) == 0
+    assert quorum_size(4) == 3
+    assert quorum_size(5) == 3
+    assert quorum_size(10, fraction=2 / 3) == 7
+    hadir = Attendance.parse(RECORDS[:2])
+    assert has_quorum(hadir, Attendance.parse(RECORDS[2:]))
+    assert not has_quorum(hadir, Attendance.parse(RECORDS[1:]))
+    assert has_quorum(Attendance(), Attendance())
+
+
+def test_attendance_rates():
+    minutes = [{"Attendance": {"Hadir": RECORDS[:2], "Tidak Hadir": RECORDS[2:]}},
+               {"Hadir": {"Nama": ["Chong"]}, "Tidak_hadir": [{"nama": "Bakar", "singkatan": "BK"}]}]
+    assert attendance_rates(minutes) == {"AH": (1, 1), "BK": (1, 2), "Chong": (1, 2)}
@@ -0,0 +1,103 @@
+"""
+Regression tests for the export backends (python -m pytest -q). Output-level
+changes to the ReportLab PDF are covered by golden_mom.py.
+"""
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from docx import Document
+from reportlab import rl_config
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph
+
+from bench_mom import make_synthetic_mom, CORPORA
+from generate_mom_docx import MOMDocx
+from generate_mom_reportlab import (BASE_DIR, LOOKAHEAD, MOMReportLab, MOMReportLabStream,
+                                    StreamingDocTemplate, StreamingStory)
+
+
+def small_mom():
+    return make_synthetic_mom(*CORPORA["small"], seed=0)
+
+
+def test_docx_control_characters():
+    # Word's manual line break (\x0b) and other control characters parse_xml rejects
+    data = small_mom()
+    data["NewMatters"][0]["Keterangan"] = "Baris satu\x0bbaris dua\x0cbaris tiga\x01."
+    data["Attendance"]["Hadir"][0]["jawatan"] = "Pengerusi\x0b"
+    data["Annex"] = "| Perkara | Jumlah |\n|---|---|\n| Yuran\x0b2025 | 10 |"
+
+    doc = Document(io.BytesIO(MOMDocx(data=data).to_bytes()))
+    text = "\n".join(p.text for p in doc.paragraphs)
+    assert "Baris satu\nbaris dua\nbaris tiga." in text
+    cells = [cell.text for table in doc.tables for row in table.rows for cell in row.cells]
+    assert "Pengerusi\n" in cells
+    assert "Yuran\n2025" in cells
+
+
+def render_pdf(data, profile):
+    renderer = MOMReportLab(output_pdf=io.BytesIO(), data=data, profile=profile)
+    renderer.create_pdf()
+    return renderer.output_pdf.getvalue()
+
+
+def test_pdf_profiles_on_concurrent_threads(monkeypatch):
+    # Binary-stream (compact) builds must not change a standard build running alongside
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    data = small_mom()
+    standard = render_pdf(data, "standard")
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(render_pdf, data, profile) for profile in ["standard", "compact"] * 4]
+        outputs = [future.result() for future in futures]
+    assert all(output == standard for output in outputs[::2])
+    assert all(b"/ASCII85Decode" not in output for output in outputs[1::2])
+
+
+def test_streaming_story_reads_ahead_a_bounded_amount():
+    style = getSampleStyleSheet()["Normal"]
+    stories, ahead = [], []
+
+    def flowables():
+        for i in range(500):
+            ahead.append(len(stories[0]) if stories else 0)
+            yield Paragraph(f"Perenggan {i}", style)
+
+    doc = StreamingDocTemplate(io.BytesIO())
+    stories.append(StreamingStory(flowables()))
+    doc.build(stories[0])
+    assert len(ahead) == 500
+    assert stories[0].taken == 500
+    assert max(ahead) < LOOKAHEAD
+    assert doc.page > 1
+
+
+def test_stream_mode_output_and_progress(monkeypatch):
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    data = small_mom()
+    events = []
+    renderer = MOMReportLabStream(output_pdf=io.BytesIO(), data=data)
+    renderer.create_pdf(lambda typ, value: events.append((typ, value)))
+    assert renderer.output_pdf.getvalue() == render_pdf(data, "standard")
+    # One estimate up front, and progress that ends on it
+    sizes = [value for typ, value in events if typ == "SIZE_EST"]
+    progress = [value for typ, value in events if typ == "PROGRESS"]
+    assert len(sizes) == 1
+    assert progress == sorted(progress) and progress[-1] == sizes[0]
+
+
+def test_mom_signatories_are_checked():
+    def signatories(value):
+        data = small_mom()
+        data["Signatories"] = value
+        MOMReportLab(output_pdf=io.BytesIO(), data=data).create_pdf()
+        MOMDocx(data=data).to_bytes()
+        return MOMReportLab(data=data).signatories()
+
+    assert signatories([{"Label": "Oleh:", "Image": None, "Nama": 7}]) == [("Oleh:", "", "7")]
+    assert signatories("Setiausaha") == MOMReportLab.SIGNATORIES
+    assert signatories(["Setiausaha"]) == MOMReportLab.SIGNATORIES
+    # Images resolve inside the app directory only
+    for path in ("/etc/hostname", "../dsaa_sign.png", "goldens/../../x.png", "ajk.csv"):
+        assert signatories([{"Label": "Oleh:", "Image": path, "Nama": "A"}])[0][1] == ""
+    assert signatories([{"Image": "dsaa_sign.png"}])[0][1] == os.path.join(BASE_DIR, "dsaa_sign.png")
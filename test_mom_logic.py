@@ -0,0 +1,166 @@
+"""
+Tests for the session-state helpers in mom_logic (python -m pytest -q): st.data_editor
+changes applied to mom_data tables and to the attendance lists.
+"""
+from mom_logic import apply_editor_changes, apply_roster_changes
+
+ROSTER = [
+    {"Siri": 1, "Nama": "Ahmad", "Jawatan": "Presiden", "Singkatan": "AH", "Hadir": "Ya"},
+    {"Siri": 2, "Nama": "Bakar", "Jawatan": "Setiausaha", "Singkatan": "BK", "Hadir": "Ya"},
+    {"Siri": 3, "Nama": "Chong", "Jawatan": "Bendahari", "Singkatan": "CH", "Hadir": "Tidak"},
+]
+
+COLUMNS = ["Perkara", "Keputusan", "Keterangan"]
+BASE = [{"Perkara": "A", "Keputusan": "Selesai", "Keterangan": "a"},
+        {"Perkara": "B", "Keputusan": "Tangguh", "Keterangan": "b"},
+        {"Perkara": "C", "Keputusan": "Selesai", "Keterangan": "c"}]
+
+
+def editor_rows():
+    return [dict(r) for r in BASE]
+
+
+def attendance():
+    hadir = [{"siri": "1", "nama": "Ahmad", "jawatan": "Presiden", "singkatan": "AH"},
+             {"siri": "2", "nama": "Bakar", "jawatan": "Setiausaha", "singkatan": "BK"}]
+    tidak_hadir = [{"siri": "3", "nama": "Chong", "jawatan": "Bendahari", "singkatan": "CH", "sebab": "Kursus"}]
+    return hadir, tidak_hadir
+
+
+def names(records):
+    return [r["nama"] for r in records]
+
+
+def test_roster_hadir_edit_moves_only_that_member():
+    hadir, tidak_hadir = attendance()
+    tidak_hadir.append({"siri": "9", "nama": "Dari minit lepas", "jawatan": "", "singkatan": "", "sebab": "Sakit"})
+    apply_roster_changes(hadir, tidak_hadir, ROSTER, {"edited_rows": {0: {"Hadir": "Tidak"}}})
+    assert names(hadir) == ["Bakar"]
+    assert names(tidak_hadir) == ["Ahmad", "Chong", "Dari minit lepas"]
+    assert tidak_hadir[0]["sebab"] == ""
+
+
+def test_roster_absent_member_returns_in_roster_order():
+    hadir, tidak_hadir = attendance()
+    apply_roster_changes(hadir, tidak_hadir, ROSTER, {"edited_rows": {2: {"Hadir": "Ya"}}})
+    assert names(hadir) == ["Ahmad", "Bakar", "Chong"]
+    assert tidak_hadir == []
+    assert "sebab" not in hadir[2]
+
+
+def test_roster_typo_fix_keeps_reason_for_absence():
+    hadir, tidak_hadir = attendance()
+    apply_roster_changes(hadir, tidak_hadir, ROSTER, {"edited_rows": {2: {"Jawatan": "Bendahari Kehormat"}}})
+    assert tidak_hadir == [{"siri": "3", "nama": "Chong", "jawatan": "Bendahari Kehormat", "singkatan": "CH",
+                            "sebab": "Kursus"}]
+    assert names(hadir) == ["Ahmad", "Bakar"]
+
+
+def test_roster_changes_already_applied_are_skipped():
+    hadir, tidak_hadir = attendance()
+    first = {"edited_rows": {0: {"Hadir": "Tidak"}}}
+    apply_roster_changes(hadir, tidak_hadir, ROSTER, first)
+    tidak_hadir[0]["sebab"] = "Bertugas"
+    second = {"edited_rows": {0: {"Hadir": "Tidak"}, 1: {"Jawatan": "SU"}}}
+    apply_roster_changes(hadir, tidak_hadir, ROSTER, second, applied=first)
+    assert tidak_hadir[0] == {"siri": "1", "nama": "Ahmad", "jawatan": "Presiden", "singkatan": "AH",
+                              "sebab": "Bertugas"}
+    assert hadir[0]["jawatan"] == "SU"
+
+
+def test_roster_edit_reverted():
+    hadir, tidak_hadir = attendance()
+    first = {"edited_rows": {1: {"Hadir": "Tidak"}}}
+    apply_roster_changes(hadir, tidak_hadir, ROSTER, first)
+    apply_roster_changes(hadir, tidak_hadir, ROSTER, {"edited_rows": {}}, applied=first)
+    assert names(hadir) == ["Ahmad", "Bakar"]
+    assert names(tidak_hadir) == ["Chong"]
+
+
+def test_roster_added_and_deleted_rows():
+    hadir, tidak_hadir = attendance()
+    first = {"added_rows": [{"Nama": "Dol", "Hadir": "Ya"}]}
+    apply_roster_changes(hadir, tidak_hadir, ROSTER, first)
+    assert names(hadir) == ["Ahmad", "Bakar", "Dol"]
+    # Typing on in the added row replaces its entry rather than adding another
+    second = {"added_rows": [{"Nama": "Dollah", "Singkatan": "DL", "Hadir": "Ya"}], "deleted_rows": [1]}
+    apply_roster_changes(hadir, tidak_hadir, ROSTER, second, applied=first)
+    assert names(hadir) == ["Ahmad", "Dollah"]
+    assert hadir[1]["singkatan"] == "DL"
+    assert names(tidak_hadir) == ["Chong"]
+
+
+def test_roster_blank_added_row_is_ignored():
+    hadir, tidak_hadir = attendance()
+    apply_roster_changes(hadir, tidak_hadir, ROSTER, {"added_rows": [{"Hadir": None}]})
+    assert (hadir, tidak_hadir) == attendance()
+
+
+def test_editor_cell_edit_touches_only_that_field():
+    rows = editor_rows()
+    first = rows[0]
+    apply_editor_changes(rows, BASE, {"edited_rows": {"0": {"Keputusan": "Batal"}}}, COLUMNS)
+    assert rows[0] is first
+    assert rows[0] == {"Perkara": "A", "Keputusan": "Batal", "Keterangan": "a"}
+    assert rows[1:] == BASE[1:]
+    assert BASE[0]["Keputusan"] == "Selesai"
+
+
+def test_editor_added_rows_are_filled_and_replaced_not_appended():
+    rows = editor_rows()
+    apply_editor_changes(rows, BASE, {"added_rows": [{"Perkara": "D"}]}, COLUMNS)
+    assert rows[3] == {"Perkara": "D", "Keputusan": "", "Keterangan": ""}
+    # added_rows is cumulative: the next change repeats the row with its new values
+    apply_editor_changes(rows, BASE, {"added_rows": [{"Perkara": "D", "Keterangan": None}, {"Perkara": "E"}]},
+                         COLUMNS)
+    assert [r["Perkara"] for r in rows] == ["A", "B", "C", "D", "E"]
+    assert rows[3]["Keterangan"] == ""
+
+
+def test_editor_edit_with_earlier_added_rows():
+    rows = editor_rows()
+    added = [{"Perkara": "D", "Keputusan": "Makluman"}]
+    apply_editor_changes(rows, BASE, {"added_rows": added}, COLUMNS)
+    apply_editor_changes(rows, BASE, {"edited_rows": {2: {"Keterangan": "c2"}}, "added_rows": added}, COLUMNS)
+    assert [r["Perkara"] for r in rows] == ["A", "B", "C", "D"]
+    assert rows[2]["Keterangan"] == "c2"
+    assert rows[3]["Keputusan"] == "Makluman"
+
+
+def test_editor_deletion_and_edit_rebuild_from_base():
+    rows = editor_rows()
+    apply_editor_changes(rows, BASE, {"edited_rows": {2: {"Perkara": "C2"}}}, COLUMNS)
+    changes = {"edited_rows": {2: {"Perkara": "C2"}, 1: {"Keputusan": "Batal"}}, "deleted_rows": [0],
+               "added_rows": [{"Perkara": "D"}]}
+    apply_editor_changes(rows, BASE, changes, COLUMNS)
+    assert [r["Perkara"] for r in rows] == ["B", "C2", "D"]
+    assert rows[0]["Keputusan"] == "Batal"
+    # Later edits keep the deletion, which stays in deleted_rows
+    changes["edited_rows"][1]["Keterangan"] = "b2"
+    apply_editor_changes(rows, BASE, changes, COLUMNS)
+    assert [r["Perkara"] for r in rows] == ["B", "C2", "D"]
+    assert rows[0]["Keterangan"] == "b2"
+
+
+def test_editor_delete_every_row():
+    rows = editor_rows()
+    apply_editor_changes(rows, BASE, {"deleted_rows": [0, 1, 2]}, COLUMNS)
+    assert rows == []
+
+
+def test_editor_placeholder_row_of_empty_table():
+    placeholder = [{"Perkara": "", "Keputusan": "Pelaksanaan", "Keterangan": ""}]
+    rows = []
+    # Editing the placeholder makes it the section's first row
+    apply_editor_changes(rows, placeholder, {"edited_rows": {0: {"Perkara": "Baru"}}}, COLUMNS)
+    assert rows == [{"Perkara": "Baru", "Keputusan": "Pelaksanaan", "Keterangan": ""}]
+    assert placeholder[0]["Perkara"] == ""
+
+    # Adding below an untouched placeholder keeps the placeholder as shown in the editor
+    rows = []
+    apply_editor_changes(rows, placeholder, {"added_rows": [{"Perkara": "X"}]}, COLUMNS)
+    assert [r["Perkara"] for r in rows] == ["", "X"]
+
+    # Deleting the placeholder leaves only the added rows
+    apply_editor_changes(rows, placeholder, {"added_rows": [{"Perkara": "X"}], "deleted_rows": [0]}, COLUMNS)
+    assert [r["Perkara"] for r in rows] == ["X"]
@@ -0,0 +1,40 @@
+"""
+Tests for the HTTP render service (python -m pytest -q).
+"""
+import pytest
+from starlette.testclient import TestClient
+
+import render_service
+from bench_mom import make_synthetic_mom, CORPORA
+from mom_io import dumps_mom
+
+
+@pytest.fixture
+def client():
+    with TestClient(render_service.create_app(workers=1)) as client:
+        yield client
+
+
+def test_render_html(client):
+    response = client.post("/render/html", content=dumps_mom(make_synthetic_mom(*CORPORA["small"], seed=0)))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+
+
+def test_body_limit(client):
+    too_large = b" " * (render_service.MAX_BODY + 1)
+    assert client.post("/render/html", content=too_large).status_code == 413
+
+    # Without a Content-Length header the limit applies while the body is read
+    def chunks():
+        for _ in range(render_service.MAX_BODY // 65536 + 2):
+            yield b" " * 65536
+    assert client.post("/render/html", content=chunks()).status_code == 413
+
+
+def test_unavailable_format(client, monkeypatch):
+    monkeypatch.setattr(render_service, "quarto_available", lambda: False)
+    assert client.get("/health").json()["formats"]["typst"] is False
+    response = client.post("/render/typst", content=b"{}")
+    assert response.status_code == 503
+    assert "failures.typst" not in client.get("/metrics").json()["counters"]